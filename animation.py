@@ -1,15 +1,46 @@
+class AnimationClock:
+    """
+    Game frames since start, advanced once per frame, so copies of an animation
+    stay in step whether they're drawn or not.
+    """
+    def __init__(self):
+        self.frame = 0
+        self.lookups = {} # Animation.key -> position in its frames, for this frame
+
+    def advance(self):
+        self.frame += 1
+        self.lookups.clear()
+
+    def position(self, anim):
+        pos = self.lookups.get(anim.key)
+        if pos is None:
+            pos = self.lookups[anim.key] = anim.position_at(self.frame)
+        return pos
+
+
+animation_clock = AnimationClock()
+
+
 class Animation:
     def __init__(self, sp, tr, indices):
         self.sp = sp
         self.tr = tr
-        self.tick = 0
-        self.images = []
-        for i in indices:
-            self.images.append(sp.get_image_idx(i))
+        self.indices = list(indices)
+        self.key = (tr, len(self.indices))
+        # frames are sliced off the sheet the first time they're shown
 
-    def get_image(self, over=-1):
+    def position_at(self, frame):
+        """Which of the frames (0..len-1) is showing at game frame `frame`, tr frames each."""
+        return (frame // self.tr) % len(self.indices)
+
+    def index(self, over=-1):
+        """Sheet index of the frame showing now, or of frame `over` if given."""
         if over != -1:
-            return self.images[over]
-        i = self.images[(self.tick // self.tr) % len(self.images)]
-        self.tick += 1
-        return i
+            return self.indices[over]
+        return self.indices[animation_clock.position(self)]
+
+    def get_image(self, over=-1, size=None, flip=False):
+        idx = self.index(over)
+        if size is None and not flip:
+            return self.sp.get_frame(idx)
+        return self.sp.get_variant(idx, size, flip)
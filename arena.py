@@ -0,0 +1,240 @@
+import copy
+import math
+import time
+
+import numpy as np
+import pygame
+
+from game_config import AI_DECISION_HZ, FPS, TILE_SIZE
+from rl import WorldEnv
+
+
+def room_rect(coords):
+    """Rect covering a room, including the tiles its digit markers sit on."""
+    min_x = min(c[0] for c in coords)
+    max_x = max(c[0] for c in coords)
+    min_y = min(c[1] for c in coords)
+    max_y = max(c[1] for c in coords)
+    return pygame.Rect(min_x, min_y, max_x - min_x + TILE_SIZE, max_y - min_y + TILE_SIZE)
+
+
+class Arena:
+    """A numbered room whose enemies are driven by a WorldEnv."""
+    def __init__(self, rid, rect):
+        self.rid = rid
+        self.rect = rect
+        self.size = (rect.width // TILE_SIZE, rect.height // TILE_SIZE)
+        self.enemies = []
+        self.players = [] # [player] + enemies, matches env.p ordering
+        self.env = None
+        self.bg_frame = None # last BackgroundSim frame this arena was stepped, in either sim
+        self.decision_hz = AI_DECISION_HZ
+        self.held = None # last action of each enemy, held between decisions
+        self.cursor = 0
+
+    @property
+    def n_agents(self):
+        return len(self.enemies)
+
+    @property
+    def top_left(self):
+        # WorldEnv clamps to size + 1 tiles, so centre that span on the room
+        return (self.rect.x - TILE_SIZE // 2, self.rect.y - TILE_SIZE // 2)
+
+    def to_arena(self, point):
+        tl = self.top_left
+        return np.array([(point[0] - tl[0]) / self.env.scale - self.env.arena_size,
+                         (point[1] - tl[1]) / self.env.scale - self.env.arena_size])
+
+    def to_world(self, pos):
+        sx, sy = self.env.to_screen(pos)
+        tl = self.top_left
+        return (sx + tl[0], sy + tl[1])
+
+    def enter(self, pool):
+        """Grabs an env on first entry and snaps it to the players' current positions."""
+        if self.env is None:
+            self.env = pool.acquire(self.n_agents, self.size)
+        self.env.set_pos([self.to_arena(p.rect.center) for p in self.players])
+
+    def release(self, pool):
+        if self.env is not None:
+            pool.release(self.env)
+            self.env = None
+        self.bg_frame = None
+        self.held = None
+        self.cursor = 0
+
+    def sync_deaths(self):
+        for idx in range(1, self.env.n_players):
+            if self.players[idx].health.current_hp <= 0:
+                self.env.p[idx].health = 0
+
+    def sync_rects(self, start=0):
+        for i in range(start, self.env.n_players):
+            self.players[i].rect.center = self.to_world(self.env.p[i].pos)
+
+    def step_background(self, actions, player_point, substeps):
+        """
+        Steps only the enemies while the player is elsewhere. The player is parked at
+        their real position so enemies still reposition, and can't be hurt from here.
+        """
+        env = self.env
+        self.sync_deaths()
+        self.held = np.array(actions, dtype=np.float32)
+        env.p[0].pos = self.to_arena(player_point)
+        player_state = copy.deepcopy(env.p[0])
+        for _ in range(substeps):
+            for i in range(1, env.n_players):
+                env.update_player(i, actions[i - 1])
+            for i in range(1, env.n_players):
+                for j in range(i + 1, env.n_players):
+                    if env.p[i].health <= 0 or env.p[j].health <= 0: continue
+                    env.resolve_collision(env.p[i], env.p[j])
+        env.p[0] = player_state
+        self.sync_rects(start=1)
+
+
+class EnvPool:
+    """Recycles WorldEnv instances across rewinds and level loads instead of rebuilding them."""
+    def __init__(self):
+        self.free = {} # (n_agents, size) -> [WorldEnv]
+        self.created = 0
+
+    def acquire(self, n_agents, size):
+        bucket = self.free.get((n_agents, size))
+        if bucket:
+            env = bucket.pop()
+            env.reset()
+            return env
+        self.created += 1
+        return WorldEnv(n_agents, size)
+
+    def release(self, env):
+        self.free.setdefault((env.n_players - 1, env.size), []).append(env)
+
+
+class BackgroundSim:
+    """
+    Steps every arena the player isn't in as one batched sim at a reduced tick rate,
+    at most max_agents enemies per policy call.
+    """
+    def __init__(self, model, tick_every=6, max_agents=16, telemetry=None):
+        self.model = model
+        self.telemetry = telemetry
+        self.tick_every = tick_every # 60 Hz / 6 = 10 Hz
+        self.max_agents = max_agents
+        self.frame = 0
+        self.cursor = 0
+
+    def update(self, arenas, visible_rid, player_point):
+        self.frame += 1
+        visible = arenas.get(visible_rid)
+        if visible is not None and visible.env is not None:
+            visible.bg_frame = self.frame # stepped by the visible path this frame
+        if self.frame % self.tick_every:
+            return
+
+        waiting = [a for rid, a in sorted(arenas.items()) if rid != visible_rid and a.env is not None]
+        if not waiting:
+            return
+
+        batch = []
+        budget = self.max_agents
+        for k in range(len(waiting)):
+            arena = waiting[(self.cursor + k) % len(waiting)]
+            if batch and arena.n_agents > budget:
+                break
+            batch.append(arena)
+            budget -= arena.n_agents
+        self.cursor = (self.cursor + len(batch)) % len(waiting)
+
+        t0 = time.perf_counter()
+        obs = np.stack([a.env._get_obs(i) for a in batch for i in range(1, a.env.n_players)])
+        t1 = time.perf_counter()
+        actions = self.model.predict(obs, deterministic=False)[0]
+        t2 = time.perf_counter()
+
+        start = 0
+        for arena in batch:
+            # held actions cover the frames since this arena was last stepped, capped at one tick
+            elapsed = self.tick_every if arena.bg_frame is None else self.frame - arena.bg_frame
+            arena.step_background(actions[start:start + arena.n_agents], player_point,
+                                  min(elapsed, self.tick_every))
+            arena.bg_frame = self.frame
+            start += arena.n_agents
+        if self.telemetry:
+            t3 = time.perf_counter()
+            self.telemetry.record("bg", "obs", (t1 - t0) * 1000)
+            self.telemetry.record("bg", "inference", (t2 - t1) * 1000)
+            self.telemetry.record("bg", "step", (t3 - t2) * 1000)
+
+
+class DecisionScheduler:
+    """
+    Gives a round robin group of the visible arena's enemies a fresh action each frame;
+    the rest hold their last one. Group size is capped by a budget that backs off on long frames.
+    """
+    def __init__(self, model, max_per_frame=4, min_per_frame=1, telemetry=None):
+        self.model = model
+        self.telemetry = telemetry
+        self.max_per_frame = max_per_frame
+        self.min_per_frame = min_per_frame
+        self.budget = max_per_frame
+        self.frame_ms = 1000 / FPS
+        self.work_ms = 0.0 # smoothed frame time, excluding the clock's sleep
+        self.since_change = 0
+
+    def decide(self, arena):
+        env = arena.env
+        if arena.held is None:
+            arena.held = np.zeros((arena.n_agents, 4), dtype=np.float32)
+
+        alive = [i for i in range(arena.n_agents) if env.p[i + 1].health > 0]
+        if not alive:
+            return arena.held
+
+        want = math.ceil(len(alive) * arena.decision_hz / FPS)
+        count = max(1, min(want, self.budget, len(alive)))
+        group = [alive[(arena.cursor + k) % len(alive)] for k in range(count)]
+        arena.cursor = (arena.cursor + count) % len(alive)
+
+        t0 = time.perf_counter()
+        obs = np.stack([env._get_obs(i + 1) for i in group])
+        t1 = time.perf_counter()
+        arena.held[group] = self.model.predict(obs, deterministic=False)[0]
+        if self.telemetry:
+            t2 = time.perf_counter()
+            self.telemetry.record(arena.rid, "obs", (t1 - t0) * 1000)
+            self.telemetry.record(arena.rid, "inference", (t2 - t1) * 1000)
+        return arena.held
+
+    def observe(self, work_ms):
+        """Feeds the last frame's work time back into the budget."""
+        self.work_ms += (work_ms - self.work_ms) * 0.1
+        self.since_change += 1
+        if self.since_change < 30:
+            return
+        if self.work_ms > self.frame_ms and self.budget > self.min_per_frame:
+            self.budget -= 1
+            self.since_change = 0
+        elif self.work_ms < self.frame_ms * 0.75 and self.budget < self.max_per_frame:
+            self.budget += 1
+            self.since_change = 0
+
+
+def build_arenas(room_info, enemies):
+    """
+    Builds an Arena for every numbered room that has enemies in it.
+    Room bounds come from the digit markers, the agent count from the enemies inside.
+    """
+    arenas = {}
+    rects = {int(rid): room_rect(coords) for rid, coords in room_info.items() if coords}
+    for enemy in enemies:
+        for rid, rect in rects.items():
+            if rect.collidepoint(enemy.rect.center):
+                if rid not in arenas:
+                    arenas[rid] = Arena(rid, rect)
+                arenas[rid].enemies.append(enemy)
+                break
+    return arenas
@@ -0,0 +1,62 @@
+import time
+
+import pygame
+
+from ss import *
+from telemetry import draw_counts
+
+
+class AssetRegistry:
+    """Decodes each spritesheet once per process and caches SysFonts and rendered text."""
+    def __init__(self):
+        self.sheets = {} # (path, tilesize) -> Spritesheet
+        self.fonts = {} # (face, size, bold) -> Font
+        self.texts = {} # (face, size, bold, text, color) -> Surface
+        self.requests = 0
+        self.decodes = 0
+        self.decode_ms = 0.0
+
+    def spritesheet(self, path, tilesize):
+        self.requests += 1
+        key = (path, tilesize)
+        sheet = self.sheets.get(key)
+        if sheet is None:
+            start = time.perf_counter()
+            sheet = self.sheets[key] = Spritesheet(path, tilesize)
+            self.decode_ms += (time.perf_counter() - start) * 1000
+            self.decodes += 1
+        return sheet
+
+    def font(self, face, size, bold=False):
+        key = (face, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[key] = pygame.font.SysFont(face, size, bold=bold)
+        return font
+
+    def text(self, face, size, text, color, bold=False):
+        """Antialiased text, rendered the first time it's asked for and reused after that."""
+        key = (face, size, bold, text, tuple(color))
+        surf = self.texts.get(key)
+        if surf is None:
+            surf = self.texts[key] = self.font(face, size, bold).render(text, True, color)
+            draw_counts.add("text", surfaces=1)
+        return surf
+
+    def snapshot(self):
+        return (self.requests, self.decodes, self.decode_ms)
+
+    def report(self, since=(0, 0, 0.0), label="assets"):
+        requests = self.requests - since[0]
+        decodes = self.decodes - since[1]
+        decode_ms = self.decode_ms - since[2]
+        return (f"{label}: {requests} spritesheet requests, {decodes} decoded in {decode_ms:.1f}ms, "
+                f"{len(self.sheets)} unique sheets resident")
+
+
+registry = AssetRegistry()
+load_spritesheet = registry.spritesheet
+get_font = registry.font
+render_text = registry.text
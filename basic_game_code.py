@@ -1,11 +1,13 @@
 import pygame
 import math
+import time
 from game_config import *
 from reset_dialogue import *
 from win_dialogue import win_menu
 from music_select import play_music, loop_music
 from gate import *
 from ss import *
+from assets import load_spritesheet, render_text, registry as asset_registry
 from animation import *
 from enemy import Grunt
 
@@ -13,37 +15,22 @@ from enemy import Grunt
 from enemy import Grunt
 from enemy_basic import *
 from cannon import *
-
-from rl import WorldEnv
-from stable_baselines3 import PPO
+from ground import GroundLayer, StaticLayer, WaterOverlay
+from present import Presenter
+from spatial import SpatialIndex
+from simclock import sim_clock
+from render import LAYER_ACTORS, LAYER_OVERLAY, LAYER_WORLD, Interpolator, RenderBuffer, RenderQueue, sprite_size
+
+from arena import Arena, BackgroundSim, DecisionScheduler, EnvPool, build_arenas, room_rect
+from student import load_policy
+from controls import Controls
+from telemetry import AITelemetry, FrameProfiler, MemoryReport, ProfileCapture, draw_counts
 import numpy as np
 
 WARP_MUSIC_PATH = "assets/warp.wav"
 NORMAL_MUSIC_PATH = "assets/normal.wav"
 INTENSE_MUSIC_PATH = "assets/intense.wav"
 
-sps9, tilea = None, None
-
-def drawtiles(surface, p, cam):
-    global sps9, tilea
-    screen_pos = cam.apply(p)
-    if sps9 is None:
-        sps9 = Spritesheet('assets/ppp/Texture/TX Tileset Grass.png', 16)
-        tilea = (
-        Animation(sps9, 5, list(range(256))),
-        )
-    rx = (p.x // TILE_SIZE) * TILE_SIZE
-    ry = (p.y // TILE_SIZE) * TILE_SIZE
-    screen_pos = cam.apply(pygame.Rect(rx, ry, 0, 0))
-    wx = screen_pos.x
-    wy = screen_pos.y
-    for x in range(-30, 30):
-        for y in range(-20, 20):
-            xx = x + (p.x // TILE_SIZE)
-            yy = y + (p.y // TILE_SIZE)
-            img = tilea[0].get_image((xx + 377 * yy + 3 * xx * xx) % 256)
-            img = pygame.transform.scale(img, (TILE_SIZE, TILE_SIZE))
-            surface.blit(img, (wx + x * TILE_SIZE, wy + y * TILE_SIZE))
 
 def get_room(player, room_info) -> int:
     """
@@ -56,18 +43,7 @@ def get_room(player, room_info) -> int:
         if not coords:
             continue
             
-        # Find the boundaries of the room based on the digit positions
-        min_x = min(c[0] for c in coords)
-        max_x = max(c[0] for c in coords)
-        min_y = min(c[1] for c in coords)
-        max_y = max(c[1] for c in coords)
-        
-        # Create a Rect covering the room (including the tiles the digits were on)
-        room_rect = pygame.Rect(min_x, min_y, 
-                                max_x - min_x + TILE_SIZE, 
-                                max_y - min_y + TILE_SIZE)
-        
-        if room_rect.collidepoint(player_center):
+        if room_rect(coords).collidepoint(player_center):
             return int(room_id_str)
             
     return -1 # Not in a numbered room (Alleyway)
@@ -90,7 +66,9 @@ def move_with_collision(rect, dx, dy, obstacles):
 
 # --- CLASSES ---
 class Camera:
-    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    scale = 1
+
+    def __init__(self, width=RENDER_WIDTH, height=RENDER_HEIGHT):
         self.offset = pygame.Vector2(0, 0)
         self.width = width
         self.height = height
@@ -105,26 +83,60 @@ class Camera:
         self.offset = pygame.Vector2(x, y)
         self.view_rect.center = target.rect.center
 
-def draw_mini_camera(main_screen, ghost, all_objects, screen_x, screen_y):
-    capture_size = MINICAM_CAPTURE_SIZE
+class ScaledCamera(Camera):
+    """A camera that draws the world shrunk by `scale`; view_rect stays in world units."""
+    def __init__(self, width, height, scale):
+        super().__init__(width, height)
+        self.scale = scale
+        self.view_rect = pygame.Rect(0, 0, width / scale, height / scale)
 
-    display_size = MINICAM_DISPLAY_SIZE
-    mini_surface = pygame.Surface((capture_size, capture_size))
-    mini_surface.fill(BG_COLOR) 
+    def apply(self, target_rect):
+        s = self.scale
+        return pygame.Rect(round(target_rect.x * s + self.offset.x), round(target_rect.y * s + self.offset.y),
+                           round(target_rect.w * s), round(target_rect.h * s))
 
-    mini_camera = Camera(width=capture_size, height=capture_size)
-    mini_camera.update(ghost)
+    def update(self, target):
+        x = -target.rect.centerx * self.scale + int(self.width / 2)
+        y = -target.rect.centery * self.scale + int(self.height / 2)
+        self.offset = pygame.Vector2(x, y)
+        self.view_rect.center = target.rect.center
 
-    for obj in all_objects:
-        if mini_camera.view_rect.colliderect(obj.rect):
-            obj.draw(mini_surface, mini_camera)
-    
-    scaled_surface = pygame.transform.smoothscale(mini_surface, (display_size, display_size))
-    # 4. Draw a nice border around the mini-map so it pops
-    pygame.draw.rect(scaled_surface, (255, 255, 255), scaled_surface.get_rect(), 3)
+def view_camera():
+    """The main camera: the window's worth of world, drawn into the render buffer."""
+    if VIEW_SCALE == 1:
+        return Camera()
+    return ScaledCamera(RENDER_WIDTH, RENDER_HEIGHT, VIEW_SCALE)
+
+class MiniCamera:
+    """Picture-in-picture view of a ghost, redrawn refresh_hz times a second into one reused surface."""
+    def __init__(self, refresh_hz=MINICAM_REFRESH_HZ):
+        display_size = MINICAM_DISPLAY_SIZE
+        self.surface = pygame.Surface((display_size, display_size)).convert()
+        self.camera = ScaledCamera(display_size, display_size, display_size / MINICAM_CAPTURE_SIZE)
+        self.queue = RenderQueue("minimap")
+        self.refresh_ms = 1000 / refresh_hz
+        self.last_render = None
+
+    def render(self, ghost, scene, sprites):
+        self.surface.fill(BG_COLOR)
+        draw_counts.add("minimap", blits=1, pixels=self.surface.get_width() * self.surface.get_height())
+        self.camera.update(ghost)
+        view = self.camera.view_rect
+        for obj in scene.query(view) + [s for s in sprites if view.colliderect(s.rect)]:
+            obj.draw(self.queue, self.camera)
+        self.queue.flush(self.surface, self.camera)
+        # Draw a nice border around the mini-map so it pops
+        pygame.draw.rect(self.surface, (255, 255, 255), self.surface.get_rect(), 3)
+
+    def draw(self, main_screen, ghost, scene, sprites, screen_x, screen_y):
+        now = pygame.time.get_ticks()
+        if self.last_render is None or now - self.last_render >= self.refresh_ms:
+            self.render(ghost, scene, sprites)
+            self.last_render = now
+        # Paste onto the main screen at the desired UI coordinates
+        draw_counts.add("minimap", blits=1, pixels=self.surface.get_width() * self.surface.get_height())
+        return main_screen.blit(self.surface, (screen_x, screen_y))
 
-    # 5. Paste the mini_surface onto the main screen at the desired UI coordinates
-    main_screen.blit(scaled_surface, (screen_x, screen_y))
 class Boundary:
     def __init__(self, x, y, w, h, color):
         self.color = color
@@ -135,9 +147,9 @@ class Boundary:
         #     Animation(sps, 5, [64]),
         # )
 
-        sps1 = Spritesheet('assets/ppp/Texture/TX Tileset Wall.png', 32)
-        sps2 = Spritesheet('assets/ppp/Texture/TX Tileset Grass.png', 16)
-        sps3 = Spritesheet('assets/Water+.png', 16)
+        sps1 = load_spritesheet('assets/ppp/Texture/TX Tileset Wall.png', 32)
+        sps2 = load_spritesheet('assets/ppp/Texture/TX Tileset Grass.png', 16)
+        sps3 = load_spritesheet('assets/Water+.png', 16)
         self.a = (
             Animation(sps1, 5, [22 + 16]),
             Animation(sps2, 5, [21]),
@@ -146,18 +158,14 @@ class Boundary:
         )
     def draw(self, surface, camera):
         if self.color == WALL_COLOR:
-            img = self.a[0].get_image()
-            bruh = camera.apply(self.rect)
             # surface.blit(pygame.transform.scale(img, self.rect.size), self.rect)
-            surface.blit(pygame.transform.scale(img, bruh.size), bruh)
+            surface.blit(self.a[0].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft, LAYER_WORLD)
             return
         if self.color == WATER_COLOR:
-            img = self.a[2].get_image()
-            bruh = camera.apply(self.rect)
             # surface.blit(pygame.transform.scale(img, self.rect.size), self.rect)
-            surface.blit(pygame.transform.scale(img, bruh.size), bruh)
+            surface.blit(self.a[2].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft, LAYER_WORLD)
             return
-        pygame.draw.rect(surface, self.color, camera.apply(self.rect))
+        surface.rect(self.color, self.rect, layer=LAYER_WORLD)
 
 
 class Goal:
@@ -165,7 +173,7 @@ class Goal:
         self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
 
     def draw(self, surface, camera):
-        pygame.draw.rect(surface, (220, 200, 40), camera.apply(self.rect))
+        surface.rect((220, 200, 40), self.rect, layer=LAYER_WORLD)
 
 
 class Door:
@@ -187,21 +195,53 @@ class Door:
 
     def draw(self, surface, camera):
         color = DOOR_OPEN_COLOR if self.is_open else DOOR_COLOR
-        pygame.draw.rect(surface, color, camera.apply(self.rect))
+        surface.rect(color, self.rect)
 
 class Ghost:
-    def __init__(self,x,y,sequence,buttons):
+    # (sheet, frame index, flipped, size) -> tinted frame, shared by every ghost
+    tinted_frames = {}
+
+    def __init__(self,x,y,sequence,buttons,cameras=()):
         self.rect = pygame.Rect(x,y,40,40)
         self.disabled = False
         self.sequence = sequence
         self.buttons = buttons
-        sps = Spritesheet('assets/Players/Dwarf/dwarf x4.png', 128)
+        sps = load_spritesheet('assets/Players/Dwarf/dwarf x4.png', 128)
         self.down = (Animation(sps, 5, [15, 16, 17, 18]), Animation(sps, 5, [2]))
         self.right = (Animation(sps, 5, [5, 6, 7, 8]), Animation(sps, 5, [0]))
         self.up = (Animation(sps, 5, [10, 11, 12, 13]), Animation(sps, 5, [1]))
 
         self.orit = 2
         self.idle = True
+        # prebuild every frame at the size each camera draws it, so the first draw doesn't stall
+        for camera in cameras:
+            size = None
+            if camera.scale != 1:
+                size = sprite_size(camera, (sps.tilesize, sps.tilesize))
+            for anim in self.down + self.right + self.up:
+                for i in anim.indices:
+                    for flip in (False, True):
+                        Ghost.tint_frame(sps, i, flip, size)
+
+    @staticmethod
+    def tint_frame(sps, idx, flip, size=None):
+        """Builds the ghost version of a frame once: tinted, see-through and maybe mirrored."""
+        key = (sps, idx, flip, size)
+        img = Ghost.tinted_frames.get(key)
+        if img is None:
+            img = sps.get_variant(idx, size, flip).copy() # Copy so we don't tint the original
+
+            # Apply "Ghost" Tint (Grey/Blue tint)
+            # This fills the non-transparent parts of the sprite with a color
+            tint = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+            tint.fill((200, 200, 200, 150)) # Grey-blue with some alpha
+            img.blit(tint, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            draw_counts.add("ghosts", blits=1, surfaces=2, pixels=2 * img.get_width() * img.get_height())
+
+            # Optional: Set overall transparency
+            img.set_alpha(180)
+            Ghost.tinted_frames[key] = img
+        return img
     
     def draw(self, surface, camera):
         if self.disabled:
@@ -212,24 +252,16 @@ class Ghost:
         elif self.orit == 2: bb = self.down
         else: bb = self.right
         
-        # 2. Get the raw image
-        img = bb[self.idle].get_image().copy() # Copy so we don't tint the original
-        if self.orit == 1:
-            img = pygame.transform.flip(img, True, False)
-
-        # 3. Apply "Ghost" Tint (Grey/Blue tint)
-        # This fills the non-transparent parts of the sprite with a color
-        tint = pygame.Surface(img.get_size(), pygame.SRCALPHA)
-        tint.fill((200, 200, 200, 150)) # Grey-blue with some alpha
-        img.blit(tint, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        
-        # Optional: Set overall transparency
-        img.set_alpha(180) 
-
-        # 4. Blit to screen
-        screen_pos = camera.apply(self.rect)
+        # 2. Get the prebuilt ghost frame
+        anim = bb[self.idle]
+        size = None
+        if camera.scale != 1:
+            size = sprite_size(camera, (anim.sp.tilesize, anim.sp.tilesize))
+        img = Ghost.tint_frame(anim.sp, anim.index(), self.orit == 1, size)
+
+        # 4. Queue it, hung off the rect the same way as the player
         img_size = img.get_size()
-        surface.blit(img, (screen_pos.x - img_size[0] / 4, screen_pos.y - img_size[1] / 2))
+        surface.blit(img, self.rect.topleft, LAYER_ACTORS, (-img_size[0] / 4, -img_size[1] / 2))
 
     def toggle_draw(self):
         self.disabled = not self.disabled
@@ -272,14 +304,14 @@ class Player:
         self.orit = 0 # [0=w, 1=a, 2=s, 3=d]
         self.idle = True
         
-        sps = Spritesheet('assets/Players/Dwarf/dwarf x4.png', 128)
+        sps = load_spritesheet('assets/Players/Dwarf/dwarf x4.png', 128)
         self.down = (Animation(sps, 5, [15, 16, 17, 18]), Animation(sps, 5, [2]))
         self.right = (Animation(sps, 5, [5, 6, 7, 8]), Animation(sps, 5, [0]))
         self.up = (Animation(sps, 5, [10, 11, 12, 13]), Animation(sps, 5, [1]))
 
     def take_damage(self, amount):
         self.health.take_damage(amount)
-        self.flash_timer = pygame.time.get_ticks()
+        self.flash_timer = sim_clock.ticks()
     
     def handle_door_interact(self):
         """Checks for nearby doors and toggles them. Returns list of toggled door indices."""
@@ -319,21 +351,20 @@ class Player:
                 ind = self.mounted_cannon.index
         return(ind)
 
-    def move(self,buttons):
+    def move(self, buttons, controls):
         if self.mounted_cannon: return
-        keys = pygame.key.get_pressed()
         dx, dy = 0, 0
 
-        if keys[pygame.K_w]:
+        if controls.held(pygame.K_w):
             dy -= 1
             self.orit = 0
-        if keys[pygame.K_a]:
+        if controls.held(pygame.K_a):
             dx -= 1
             self.orit = 1
-        if keys[pygame.K_s]:
+        if controls.held(pygame.K_s):
             dy += 1
             self.orit = 2
-        if keys[pygame.K_d]:
+        if controls.held(pygame.K_d):
             dx += 1
             self.orit = 3
 
@@ -356,9 +387,14 @@ class Player:
         return(self.orit,self.idle)
     
 
+    def anim_state(self):
+        """(orientation, idle) as recorded for replays."""
+        if self.mounted_cannon: return (2, True)
+        return (self.orit, self.idle)
+
     def draw(self, surface, camera):
         if self.mounted_cannon: return (2, True)
-        now = pygame.time.get_ticks()
+        now = sim_clock.ticks()
         color = (255, 0, 0) if now - self.flash_timer < 150 else (50, 150, 255)
         if self.orit == 0:
             bb = self.up
@@ -366,15 +402,17 @@ class Player:
             bb = self.down
         else:
             bb = self.right
-        img = bb[self.idle].get_image()
-        if self.orit == 1:
-            img = pygame.transform.flip(img, 1, 0)
-        bruh = camera.apply(self.rect)
+        anim = bb[self.idle]
+        size = None
+        if camera.scale != 1:
+            size = sprite_size(camera, (anim.sp.tilesize, anim.sp.tilesize))
+        img = anim.get_image(size=size, flip=self.orit == 1)
         # surface.blit(img, (0, 0))
         pp = img.get_size()
         # print(pp)
         # surface.blit(img, (bruh.x - pp[0] / 4, bruh.y - pp[1] / 2))
-        surface.blit(img, (bruh.x - pp[0] / 4 - 5, bruh.y - pp[1] / 2 - 20))
+        surface.blit(img, self.rect.topleft, LAYER_ACTORS,
+                     (-pp[0] / 4 - 5 * camera.scale, -pp[1] / 2 - 20 * camera.scale))
         # print(bruh, pp)
         # surface.blit(pygame.transform.scale(img, bruh.size), (bruh.x, bruh.y))
         # surface.blit(img, (bruh.x - bruh.w, bruh.y - bruh.h))
@@ -383,57 +421,44 @@ class Player:
         self.health.draw(surface, camera)
         return (self.orit, self.idle)
 
-envs = {
-    1: WorldEnv(4, (16,8)),
-    4: WorldEnv(1, (8,8))
-    # 5: WorldEnv(2),
-    # 6: WorldEnv(2),
-    # 7: WorldEnv(1),
-}
-room_tl = {
-    1: (11, 15),
-    4: (16, 31),
-    # 5: (29, 31),
-}
-for rid in room_tl:
-    room_tl[rid] = (room_tl[rid][0] * TILE_SIZE, room_tl[rid][1] * TILE_SIZE)
-env_players = {
-    1: [],
-    4: []
-    # 5: [],
-}
-model = PPO.load("ai/modelSELF28/final", env=envs[1])
+def movers(player, ghost1, ghost2, enemies, cannons):
+    """Everything whose position changes from one sim step to the next."""
+    return [player] + [g for g in (ghost1, ghost2) if g] + enemies + [p for c in cannons for p in c.projectiles]
+
+memory_report = MemoryReport(MEMORY_TRACE) # first, so MEMORY_TRACE sees everything after it
+env_pool = EnvPool()
+model = load_policy(AI_POLICY_PATH)
+ai_telemetry = AITelemetry()
+frame_profiler = FrameProfiler()
+profile_capture = ProfileCapture(PROFILE_FRAMES)
+background_sim = BackgroundSim(model, telemetry=ai_telemetry)
+decision_scheduler = DecisionScheduler(model, telemetry=ai_telemetry)
 game_over = False
 
-def to_screen(pos, rid):
-    p = envs[rid].to_screen(envs[rid].p[0].pos)
-
-def update_env(env: WorldEnv, rid, left_clicked):
+def update_env(arena: Arena, left_clicked, controls):
     global game_over
+    env = arena.env
     #bosco is gay
-    for idx in range(1, env.n_players):
-        if env_players[rid][idx].health.current_hp <= 0:
-            env.p[idx].health = 0
+    arena.sync_deaths()
 
-    keys = pygame.key.get_pressed()
     dx = 0
     dy = 0
-    if keys[pygame.K_w]:
+    if controls.held(pygame.K_w):
         dy -= env.player_speed
-    if keys[pygame.K_s]:
+    if controls.held(pygame.K_s):
         dy += env.player_speed
-    if keys[pygame.K_a]:
+    if controls.held(pygame.K_a):
         dx -= env.player_speed
-    if keys[pygame.K_d]:
+    if controls.held(pygame.K_d):
         dx += env.player_speed
 
-    mouse_x, mouse_y = pygame.mouse.get_pos()
+    mouse_x, mouse_y = controls.mouse_pos
     center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
     angle = np.arctan2(mouse_y - center_y, mouse_x - center_x)
     angle_diff = env._angle_diff(angle, env.p[0].angle)
     angle_diff = np.clip(angle_diff, -1.0, 1.0)
 
-    right_pressed = pygame.mouse.get_pressed()[2]
+    right_pressed = controls.mouse_buttons[2]
     shield = right_pressed
     attack = 1 if left_clicked else 0
     combat = 0
@@ -443,28 +468,23 @@ def update_env(env: WorldEnv, rid, left_clicked):
         combat = -1
 
     env.player_action = [dx, dy, angle_diff, combat]
-    actions = [model.predict(env._get_obs(i), deterministic=False)[0] for i in range(1, env.n_players)]
+    actions = decision_scheduler.decide(arena)
+    t0 = time.perf_counter()
     env.step(0, env.player_action, actions)
-
-    for i in range(env.n_players):
-        # print(env.p[i].pos)
-        tmp = env.to_screen(env.p[i].pos)
-        tmp1 = room_tl[rid]
-        pos = (tmp[0]+tmp1[0], tmp[1]+tmp1[1])
-        env_players[rid][i].rect.centerx = pos[0]
-        env_players[rid][i].rect.centery = pos[1]
+    t1 = time.perf_counter()
+    arena.sync_rects()
+    ai_telemetry.record(arena.rid, "step", (t1 - t0) * 1000)
+    ai_telemetry.record(arena.rid, "sync", (time.perf_counter() - t1) * 1000)
     
     if env.p[0].health <= 0:
         game_over = True
 
-def draw_ai(screen, camera, rid, idx, player_color):
-        env = envs[rid]
-        off = room_tl[rid]
+def draw_ai(queue, arena: Arena, idx, player_color):
+        env = arena.env
         if env.p[idx].health <= 0:
             return
 
-        spos1 = env.to_screen(env.p[idx].pos)
-        spos = (off[0]+camera.offset.x+spos1[0], off[1]+camera.offset.y+spos1[1])
+        spos = arena.players[idx].rect.center # interpolated like the sprite, env.p is a step ahead
         
 
         # # draw player
@@ -475,60 +495,83 @@ def draw_ai(screen, camera, rid, idx, player_color):
         ax = np.cos(angle)
         ay = np.sin(angle)
         if env.p[idx].attack:
-            pygame.draw.circle(screen, (255, 255, 0), (spos[0] + int(ax * 25), spos[1] + int(ay * 25)), 10)
+            queue.circle((255, 255, 0), (spos[0] + int(ax * 25), spos[1] + int(ay * 25)), 10, LAYER_OVERLAY)
 
         # Draw attack direction
         end_x = spos[0] + int(ax * 25)
         end_y = spos[1] + int(ay * 25)
-        pygame.draw.line(screen, (255, 255, 0), spos, (end_x, end_y), 3)
+        queue.line((255, 255, 0), spos, (end_x, end_y), 3, LAYER_OVERLAY)
 
         # draw shieldd
         if env.p[idx].shield:
             offset = (env.p[idx].radius + 0.3) * env.scale
             shield_rect = pygame.rect.Rect(spos[0] - offset, spos[1] - offset, 2 * offset, 2 * offset)
-            pygame.draw.arc(screen, player_color, shield_rect, -(angle + env.shield_angle), -(angle - env.shield_angle), 5)
+            queue.arc(player_color, shield_rect, -(angle + env.shield_angle), -(angle - env.shield_angle), 5, LAYER_OVERLAY)
+
+def draw_ai_health(screen, arena: Arena, idx, player_color):
+        env = arena.env
+        if env.p[idx].health <= 0:
+            return
 
         # # Health bar
         hpbar_top = 20 + 20 * idx
         pygame.draw.rect(screen, player_color, (20, hpbar_top, 20 * env.p[idx].health, 10))
+        draw_counts.add("hud", blits=1, pixels=20 * env.p[idx].health * 10)
 
 # --- MAIN ---
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Top Down Melee, Cannon & Gate Engine")
-    clock = pygame.time.Clock()
-    
-    running = True
-    saved_slots = [None, None]
-    history = None
-    warped_once = False
-
-    while running:
-        if warped_once:
+class Game:
+    """
+    The game loop as something that can be stepped: tick(dt_ms, events, controls) runs the
+    sim steps that time covers and draws one frame. `running` goes False once the game quits.
+    """
+    def __init__(self, screen, level_map=LEVEL_MAP, adaptive_ai=ADAPTIVE_AI_BUDGET):
+        self.screen = screen
+        self.level_map = level_map
+        self.adaptive_ai = adaptive_ai
+        if not adaptive_ai:
+            decision_scheduler.budget = decision_scheduler.max_per_frame # frame time never feeds into the sim
+        self.buffer = RenderBuffer(screen)
+        self.ground = GroundLayer((SCREEN_WIDTH, SCREEN_HEIGHT), VIEW_SCALE)
+        self.presenter = Presenter()
+        self.minimaps = (MiniCamera(), MiniCamera())
+        self.queue = RenderQueue()
+        self.interpolator = Interpolator()
+
+        self.running = True
+        self.saved_slots = [None, None]
+        self.history = None
+        self.warped_once = False
+        self.arenas: dict[int, Arena] = {}
+        self.load_level()
+
+    def load_level(self):
+        if self.warped_once:
             loop_music(INTENSE_MUSIC_PATH)
         else:
             loop_music(NORMAL_MUSIC_PATH)
 
-        if history:
-            save_menu(screen,history,saved_slots)
-        history = {"doors": {}, # doors: frame -> list of door indices toggled
+        if self.history:
+            save_menu(self.screen, self.history, self.saved_slots)
+        self.history = {"doors": {}, # doors: frame -> list of door indices toggled
                    "cShoot": {}, # cShoot: frame -> (cannon index, angle) for every cannon shot
                    "cannons": {}, # cannon: frame -> cannon index interacted with (or None)
                    "animations": {}, # animations: frame -> list of animation types triggered (e.g. "cannon_shoot") for every frame that an animation is triggered (used for replaying cannon shoot animations since they don't have a physical representation like doors do)
                    "locations": {}} #locations: frame -> (player_x, player_y) for every locationInterval frames (look in config)
         walls, doors, waters, cannons, buttons, gates, enemies = [], [], [], [], [], [], []
         goal = None
-        player = None
-        frame = 0
+        self.frame = 0
+
+        self.prid = -1
+        for arena in self.arenas.values():
+            arena.release(env_pool)
 
-        prid = -1
-        
         # Load Level
+        load_start = time.perf_counter()
+        assets_before = asset_registry.snapshot()
         button_map: dict[str, list[GateButton]] = {}
         gate_map: dict[str, list[tuple]] = {}
         room_info: dict[str, tuple] = {}
-        for r, row in enumerate(LEVEL_MAP):
+        for r, row in enumerate(self.level_map):
             for c, char in enumerate(row):
                 x, y = c * TILE_SIZE, r * TILE_SIZE
                 if char == '.':
@@ -537,12 +580,10 @@ def main():
                     if char not in room_info:
                         room_info[char] = []
                     room_info[char].append((x, y))
-                    if ord(char)-ord('0') not in room_tl:
-                        walls.append(Boundary(x, y, TILE_SIZE, TILE_SIZE, WALL_COLOR))
                 elif char == "W": walls.append(Boundary(x, y, TILE_SIZE, TILE_SIZE, WALL_COLOR))
                 elif char == "B": waters.append(Boundary(x, y, TILE_SIZE, TILE_SIZE, WATER_COLOR))
                 elif char == "G": enemies.append(Grunt(x, y))
-                elif char == "T": 
+                elif char == "T":
                     cannon = Cannon(x,y)
                     cannon.index = len(cannons) # Store the index of this cannon for replay purposes
                     cannons.append(cannon)
@@ -569,182 +610,305 @@ def main():
                     else:
                         if char not in gate_map: gate_map[char] = []
                         gate_map[char].append((x, y))
-                    
+
         for gate_char in gate_map:
             for gate_pos in gate_map[gate_char]:
                 gate = Gate(*gate_pos, button_map[gate_char.lower()], gate_char.lower())
                 gates.append(gate)
-        
-        player = Player(*player_start_pos, walls + waters, doors, cannons, gates)
-        ghost1 = None
-        ghost2 = None
-        if saved_slots[0]:
-            ghost1 = Ghost(*saved_slots[0]["locations"][1], saved_slots[0],buttons)
-            
-        if saved_slots[1]:
-            ghost2 = Ghost(*saved_slots[1]["locations"][1], saved_slots[1],buttons)
-        camera = Camera()
-        all_drawables = walls + waters + doors + buttons + gates + enemies + cannons
-        if goal:
-            all_drawables.append(goal)
-        reset = False
-
-        for rid in env_players:
-            env_players[rid].clear()
-            env_players[rid].append(player)
-        # print(enemies)
-        for enemy in enemies:
-            rid = get_room(enemy, room_info)
-            env_players[rid].append(enemy)
-        # for rid in env_players:
-        #     print(rid, len(env_players[rid]))
 
-            
-
-        trigger_rewind = False
-        while not reset and running:
-            frame += 1
-            if ghost1: ghost1.update(frame, doors, cannons, player.rect) #note, update doesn't draw the ghost, that is further down
-            if ghost2: ghost2.update(frame, doors, cannons, player.rect)
+        # Rooms with enemies in them become AI arenas, other room markers are just walls
+        self.arenas = build_arenas(room_info, enemies)
+        for room_id_str, coords in room_info.items():
+            if int(room_id_str) not in self.arenas:
+                for x, y in coords:
+                    walls.append(Boundary(x, y, TILE_SIZE, TILE_SIZE, WALL_COLOR))
+
+        self.player = player = Player(*player_start_pos, walls + waters, doors, cannons, gates)
+        self.camera = view_camera()
+        ghost_cameras = [self.camera] + [m.camera for m in self.minimaps]
+        self.ghost1 = None
+        self.ghost2 = None
+        if self.saved_slots[0]:
+            self.ghost1 = Ghost(*self.saved_slots[0]["locations"][1], self.saved_slots[0],buttons, ghost_cameras)
+
+        if self.saved_slots[1]:
+            self.ghost2 = Ghost(*self.saved_slots[1]["locations"][1], self.saved_slots[1],buttons, ghost_cameras)
+        load_ms = (time.perf_counter() - load_start) * 1000
+        print(asset_registry.report(assets_before, f"Level loaded in {load_ms:.1f}ms"))
+        self.walls, self.doors, self.waters, self.cannons = walls, doors, waters, cannons
+        self.buttons, self.gates, self.enemies, self.goal = buttons, gates, enemies, goal
+        self.room_info = room_info
+        # Walls and the goal never change, so they're baked once; water is one blit per region
+        self.world_layers = world_layers = [StaticLayer(walls + ([goal] if goal else []), VIEW_SCALE), WaterOverlay(waters)]
+        self.scene = SpatialIndex()
+        for obj in world_layers + doors + buttons + gates + enemies + cannons:
+            self.scene.add(obj)
+        self.presenter.mark_full()
+        self.reset = False
+        self.interpolator.snapshot([])
+        self.pending_events = []
+        self.just_loaded = True
+        self.sim_ms = SIM_STEP_MS # so the first tick runs frame 1 straight away
+
+        for arena in self.arenas.values():
+            arena.players = [player] + arena.enemies
+
+        self.trigger_rewind = False
+        memory_report.report(f"level loaded, {len(walls)} walls, {len(enemies)} enemies", self.memory_owners())
+
+    def memory_owners(self):
+        """What each subsystem holds, for the memory report. Shared things go to the first owner listed."""
+        return {
+            "sprites": [asset_registry.sheets, Ghost.tinted_frames],
+            "tiles": [self.ground, self.world_layers],
+            "history": [self.history, self.saved_slots],
+            "ai models": [model, env_pool.free, [arena.env for arena in self.arenas.values()]],
+            "render": [self.buffer.surface, self.minimaps, asset_registry.texts],
+        }
+
+    def tick(self, dt_ms, events, controls):
+        """
+        One drawn frame: dt_ms of game time, the events since the last tick and what's
+        held down. Returns running.
+        """
+        start = time.perf_counter()
+        if self.just_loaded:
+            dt_ms = 0 # time spent loading and in menus isn't game time
+            self.just_loaded = False
+        # Simulation runs in fixed 1/FPS steps, as many as the time since the last
+        # drawn frame covers (up to MAX_SIM_STEPS); drawing happens once per tick.
+        self.sim_ms += dt_ms
+        frame_profiler.begin_frame()
+        self.pending_events += events
+        frame_profiler.lap("events")
+        steps = 0
+        while self.sim_ms >= SIM_STEP_MS and steps < MAX_SIM_STEPS and not self.reset and self.running:
+            self.sim_ms -= SIM_STEP_MS
+            steps += 1
+            self.step(controls)
+        if self.sim_ms >= SIM_STEP_MS:
+            self.sim_ms %= SIM_STEP_MS # too far behind to catch up, drop the backlog rather than spiral
+        if self.reset or not self.running:
+            if self.running:
+                self.load_level()
+            return self.running
+
+        self.draw()
+        frame_profiler.end_frame()
+        draw_counts.end_frame()
+        profile_capture.end_frame()
+        self.interpolator.restore()
+        if self.adaptive_ai:
+            decision_scheduler.observe((time.perf_counter() - start) * 1000)
+        return self.running
+
+    def step(self, controls):
+        """One fixed sim step."""
+        player, history, camera = self.player, self.history, self.camera
+        ghost1, ghost2 = self.ghost1, self.ghost2
+        doors, cannons, enemies = self.doors, self.cannons, self.enemies
+        self.interpolator.snapshot(movers(player, ghost1, ghost2, enemies, cannons))
+        self.frame += 1
+        frame = self.frame
+        animation_clock.advance()
+        sim_clock.advance()
+        if ghost1: ghost1.update(frame, doors, cannons, player.rect) #note, update doesn't draw the ghost, that is further down
+        if ghost2: ghost2.update(frame, doors, cannons, player.rect)
+        frame_profiler.lap("ghosts")
+
+        if frame % LOCATION_INTERVAL == 0 or frame == 1:
+            history["locations"][frame] = (player.rect.x, player.rect.y)
+
+        # --- EVENTS --- (everything since the last step lands on this one)
+        left_clicked = False
+        for event in self.pending_events:
+            if event.type == pygame.QUIT:
+                self.running = False
+                self.reset = True
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:
+                    left_clicked = True
+                    break
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    play_music(WARP_MUSIC_PATH)
+                    self.warped_once = True
+                    self.trigger_rewind = True
+                    self.reset = True
+                    continue
+                if event.key == pygame.K_e:
+                    # Interact with Doors
+                    history["doors"][frame] = player.handle_door_interact()
+                    # Interact with Buttons
+
+                if event.key == pygame.K_F3:
+                    ai_telemetry.toggle()
+                if event.key == pygame.K_F4:
+                    frame_profiler.toggle()
+                    draw_counts.toggle()
+                if event.key == pygame.K_F5:
+                    profile_capture.start()
+                if event.key == pygame.K_F6:
+                    memory_report.toggle_trace(f"frame {frame}", self.memory_owners())
+
+                if event.key == pygame.K_m:
+                    interacted_cannon_index = player.interact_cannon()
+                    if interacted_cannon_index is not None:
+                        history["cannons"][frame] = interacted_cannon_index
+        self.pending_events = []
+        frame_profiler.lap("events")
+
+        if self.trigger_rewind:
+            active_ghosts = [g for g in [ghost1, ghost2] if g is not None]
+            replay_reverse(self.buffer, history, self.scene, camera, player, active_ghosts)
+            save_menu(self.screen, history, self.saved_slots)
+            self.history = None
+            return
 
-            if frame % LOCATION_INTERVAL == 0 or frame == 1:
-                history["locations"][frame] = (player.rect.x, player.rect.y)
-            
-            # --- EVENTS ---
-            left_clicked = False
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    reset = True
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        left_clicked = True
-                        break
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:
-                        play_music(WARP_MUSIC_PATH)
-                        warped_once = True
-                        trigger_rewind = True
-                        reset = True
-                        continue
-                    if event.key == pygame.K_e:
-                        # Interact with Doors
-                        history["doors"][frame] = player.handle_door_interact()
-                        # Interact with Buttons
-
-                    if event.key == pygame.K_m:
-                        interacted_cannon_index = player.interact_cannon()
-                        if interacted_cannon_index is not None:
-                            history["cannons"][frame] = interacted_cannon_index
-                    
-            if trigger_rewind:
-                active_ghosts = [g for g in [ghost1, ghost2] if g is not None]
-                replay_reverse(screen, history, all_drawables, camera, player, active_ghosts)
-                save_menu(screen, history, saved_slots)
-                history = None
-                continue
-
-            # --- UPDATE ---
-            if not pygame.mixer.music.get_busy():
-                if warped_once:
-                    loop_music(INTENSE_MUSIC_PATH)
+        # --- UPDATE ---
+        if not pygame.mixer.music.get_busy():
+            if self.warped_once:
+                loop_music(INTENSE_MUSIC_PATH)
+            else:
+                loop_music(NORMAL_MUSIC_PATH)
+
+        player.move(self.buttons, controls)
+        camera.update(player)
+        history["animations"][frame] = player.anim_state()
+        frame_profiler.lap("player")
+        # print(player.rect.center)
+
+
+        tmprid = get_room(player, self.room_info)
+        if tmprid in self.arenas:
+            if self.prid != tmprid:
+                self.arenas[tmprid].enter(env_pool)
+            update_env(self.arenas[tmprid], left_clicked, controls)
+        background_sim.update(self.arenas, tmprid, player.rect.center)
+        ai_telemetry.end_frame()
+        self.prid = tmprid
+        frame_profiler.lap("ai")
+
+        for c in cannons:
+            obstacles = [w.rect for w in self.walls] + [d.rect for d in doors if not d.is_open] \
+                + [g.rect for g in self.gates if not g.is_open]
+            c.update(camera, obstacles, enemies, controls.mouse_pos)
+        gate_blockers = [player.rect] + [enemy.rect for enemy in enemies]
+        for g in self.gates:
+            g.update(gate_blockers)
+
+        if player.mounted_cannon and controls.mouse_buttons[0]:
+            val = player.mounted_cannon.shoot() #val = cannon_index,angle tuple or None
+            if val:
+                history["cShoot"][frame] = val
+
+        for e in enemies:
+            nav_data = {
+                "level_map": self.level_map,
+                "boundaries": [w.rect for w in (self.waters + self.walls)],
+                "doors": doors,
+                "gates": self.gates,
+            }
+            e.update(player, nav_data)
+            if e.health.is_dead:
+                enemies.remove(e)
+                self.scene.remove(e)
+            else:
+                self.scene.move(e) # covers the AI moving it this frame too
+        frame_profiler.lap("world")
+
+        if self.goal and player.rect.colliderect(self.goal.rect):
+            win_menu(self.screen)
+            self.history = None
+            self.running = False
+            self.reset = True
+
+    def draw(self):
+        """Draws and presents a frame, everything that moves part way between its last two steps."""
+        screen, buffer, queue, camera, presenter = self.screen, self.buffer, self.queue, self.camera, self.presenter
+        player, ghost1, ghost2, scene = self.player, self.ghost1, self.ghost2, self.scene
+        arenas, prid = self.arenas, self.prid
+        self.interpolator.lerp(self.sim_ms / SIM_STEP_MS)
+        camera.update(player)
+        buffer.clear(BG_COLOR)
+        self.ground.draw(queue, camera)
+        queue.flush(buffer.surface, camera)
+        frame_profiler.lap("ground")
+        # Queue everything up, the layers keep it in order
+        visible = scene.query(camera.view_rect)
+        for obj in visible:
+            obj.draw(queue, camera)
+
+        if ghost1: ghost1.draw(queue, camera)
+        if ghost2: ghost2.draw(queue, camera)
+        player.draw(queue, camera)
+        if prid in arenas:
+            for i in range(arenas[prid].env.n_players):
+                draw_ai(queue, arenas[prid], i, (50, 150, 255) if i == 0 else (255, 80, 80))
+        queue.flush(buffer.surface, camera)
+        buffer.upscale()
+        frame_profiler.lap("drawables")
+
+        # --- UI, at window resolution ---
+        screen_rect = pygame.Rect(0, 0, RENDER_WIDTH, RENDER_HEIGHT)
+        if ghost1 and not ghost1.disabled:
+            ghost1_screen_pos = camera.apply(ghost1.rect)
+            if not screen_rect.colliderect(ghost1_screen_pos): # If off-screen
+                # Draw at the top left
+                if ghost2:
+                    ghosts = [ghost1,ghost2]
                 else:
-                    loop_music(NORMAL_MUSIC_PATH)
-
-            player.move(buttons)
-            camera.update(player)
-            # print(player.rect.center)
-
-
-            tmprid = get_room(player, room_info)
-            if tmprid in room_tl:
-                if prid != tmprid:
-                    prid = tmprid
-                    print(env_players[prid])
-                    for e in env_players[prid]:
-                        print((e.rect.centerx-room_tl[prid][0])/50-10, (e.rect.centery-room_tl[prid][1])/50-10)
-                    envs[prid].set_pos([((e.rect.centerx-room_tl[prid][0])/50-10, (e.rect.centery-room_tl[prid][1])/50-10)
-                                       for e in env_players[prid]])
-                update_env(envs[prid], prid, left_clicked)
-            prid = tmprid
-            
-            for c in cannons:
-                obstacles = [w.rect for w in walls] + [d.rect for d in doors if not d.is_open] \
-                    + [g.rect for g in gates if not g.is_open]
-                c.update(camera, obstacles, enemies)
-            gate_blockers = [player.rect] + [enemy.rect for enemy in enemies]
-            for g in gates:
-                g.update(gate_blockers)
-
-            if player.mounted_cannon and pygame.mouse.get_pressed()[0]:
-                val = player.mounted_cannon.shoot() #val = cannon_index,angle tuple or None
-                if val:
-                    history["cShoot"][frame] = val
-
-            for e in enemies:
-                nav_data = {
-                    "level_map": LEVEL_MAP,
-                    "boundaries": [w.rect for w in (waters + walls)],
-                    "doors": doors,
-                    "gates": gates,
-                }
-                e.update(player, nav_data)
-                if e.health.is_dead: enemies.remove(e)
-
-            if goal and player.rect.colliderect(goal.rect):
-                win_menu(screen)
-                history = None
-                running = False
-                reset = True
-                continue
-
-            # --- DRAW ---
-            screen.fill(BG_COLOR)
-            drawtiles(screen, player.rect, camera)
-            # Draw everything in order
-            all_drawables = walls + waters + doors + buttons + gates + enemies + cannons
-            if goal:
-                all_drawables.append(goal)
-            for obj in all_drawables:
-                if camera.view_rect.colliderect(obj.rect):
-                    obj.draw(screen, camera)
-            
-            if ghost1: ghost1.draw(screen, camera)
-            if ghost2: ghost2.draw(screen, camera)
-            history["animations"][frame] = player.draw(screen, camera)
-            screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
-            if ghost1 and not ghost1.disabled:
-                ghost1_screen_pos = camera.apply(ghost1.rect)
-                if not screen_rect.colliderect(ghost1_screen_pos): # If off-screen
-                    # Draw at the top left
-                    if ghost2:
-                        ghosts = [ghost1,ghost2]
-                    else:
-                        ghosts = [ghost1]
-                    draw_mini_camera(screen, ghost1, all_drawables + [player] + ghosts, 20, 20)
-            
-            if prid in room_tl:
-                for i in range(envs[prid].n_players):
-                    draw_ai(screen, camera, prid, i, (50, 150, 255) if i == 0 else (255, 80, 80))
-
-            if ghost2 and not ghost2.disabled:
-                ghost2_screen_pos = camera.apply(ghost2.rect)
-                if not screen_rect.colliderect(ghost2_screen_pos): # If off-screen
-                    # Draw slightly below the first mini-camera
-                    if ghost1:
-                        ghosts = [ghost1,ghost2]
-                    else:
-                        ghosts = [ghost2]
-                    draw_mini_camera(screen, ghost2, all_drawables + [player] + ghosts, 20, 40 + MINICAM_DISPLAY_SIZE)
-            
-            font = pygame.font.SysFont(None, 72)
-            text_surface = font.render("GAME OVER", True, (255, 0, 0))
-            if game_over:
-                screen.blit(text_surface, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
-            
-            pygame.display.flip()
-            clock.tick(FPS)
-            
+                    ghosts = [ghost1]
+                presenter.mark(self.minimaps[0].draw(screen, ghost1, scene, [player] + ghosts, 20, 20))
+
+        if ghost2 and not ghost2.disabled:
+            ghost2_screen_pos = camera.apply(ghost2.rect)
+            if not screen_rect.colliderect(ghost2_screen_pos): # If off-screen
+                # Draw slightly below the first mini-camera
+                if ghost1:
+                    ghosts = [ghost1,ghost2]
+                else:
+                    ghosts = [ghost2]
+                presenter.mark(self.minimaps[1].draw(screen, ghost2, scene, [player] + ghosts, 20, 40 + MINICAM_DISPLAY_SIZE))
+        frame_profiler.lap("minimap")
+
+        if prid in arenas:
+            for i in range(arenas[prid].env.n_players):
+                draw_ai_health(screen, arenas[prid], i, (50, 150, 255) if i == 0 else (255, 80, 80))
+            presenter.mark((20, 20, 20 * arenas[prid].env.max_health, 20 * arenas[prid].env.n_players))
+
+        if game_over:
+            text_surface = render_text(None, 72, "GAME OVER", (255, 0, 0))
+            presenter.mark(screen.blit(text_surface, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50)))
+            draw_counts.add("hud", blits=1, pixels=text_surface.get_width() * text_surface.get_height())
+        for overlay in (ai_telemetry, frame_profiler, draw_counts):
+            overlay_rect = overlay.draw(screen)
+            if overlay_rect:
+                presenter.mark(overlay_rect)
+
+        presenter.track_camera(camera)
+        presenter.mark_drawables(camera, visible, [player] + [g for g in (ghost1, ghost2) if g])
+        frame_profiler.lap("hud")
+        presenter.present()
+        frame_profiler.lap("flip")
+
+    def close(self):
+        ai_telemetry.close()
+        frame_profiler.close()
+        draw_counts.close()
+        profile_capture.close()
+        memory_report.close()
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Top Down Melee, Cannon & Gate Engine")
+    clock = pygame.time.Clock()
+    game = Game(screen)
+    while game.running:
+        game.tick(clock.tick(RENDER_FPS), pygame.event.get(), Controls.live())
+    game.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window, no sound
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import json
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from game_config import RENDER_HEIGHT, RENDER_WIDTH, SCREEN_HEIGHT, SCREEN_WIDTH, SIM_STEP_MS, load_map
+from controls import Controls
+from telemetry import FRAME_PHASES, LOG_DIR, RollingStats
+import basic_game_code as game_code
+
+# Plays a map headless with scripted input and reports frame time percentiles and
+# where the time went by phase. Every frame is fed exactly one sim step of time, so
+# a run does the same work on any machine and results line up between commits.
+# The AI decision budget is pinned too, so frame time can't change the gameplay.
+# Run from the repo root: python benchmark.py [map name in maps/] [frames]
+
+map_name = "game_map"
+n_frames = 1200
+warmup_frames = 60 # not counted: chunk baking, first policy calls
+seed = 0
+# (frames, keys held), played in order and looped; "e" taps the interact key on the first frame
+script = [(90, "w"), (60, "d"), (90, "s"), (60, "a"), (1, "e"), (45, "wd"), (45, "sa")]
+quantiles = (0.5, 0.9, 0.95, 0.99)
+
+
+def scripted_input(n):
+    """(events, Controls) for each of n frames."""
+    frames = []
+    while len(frames) < n:
+        for length, keys in script:
+            held = [pygame.key.key_code(k) for k in keys if k != "e"]
+            for i in range(length):
+                events = []
+                if i == 0 and "e" in keys:
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_e))
+                frames.append((events, Controls(held, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))))
+    return frames[:n]
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def run(name, frames):
+    random.seed(seed)
+    np.random.seed(seed)
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    # pinned AI budget, or a slower commit would also change what the AI does
+    game = game_code.Game(screen, load_map(os.path.join("maps", name + ".txt")), adaptive_ai=False)
+
+    total = RollingStats(frames)
+    phases = {phase: RollingStats(frames) for phase in FRAME_PHASES}
+    played = 0
+    for i, (events, controls) in enumerate(scripted_input(warmup_frames + frames)):
+        start = time.perf_counter()
+        game.tick(SIM_STEP_MS, events, controls)
+        ms = (time.perf_counter() - start) * 1000
+        if not game.running or game.frame < i: # quit, or the level ended and reloaded
+            print(f"Level ended after {i} frames, stopping early")
+            break
+        if i < warmup_frames:
+            continue
+        total.add(ms)
+        for phase in FRAME_PHASES:
+            phases[phase].add(game_code.frame_profiler.current[phase])
+        played += 1
+    game.close()
+    pygame.quit()
+
+    result = {
+        "map": name,
+        "commit": commit(),
+        "frames": played,
+        "window": [SCREEN_WIDTH, SCREEN_HEIGHT],
+        "render": [RENDER_WIDTH, RENDER_HEIGHT],
+        "frame_ms": dict(zip([f"p{round(q * 100)}" for q in quantiles], total.percentiles(quantiles))),
+        "frame_mean_ms": sum(total.values) / max(1, played),
+        "phase_mean_ms": {phase: sum(s.values) / max(1, played) for phase, s in phases.items()},
+        "phase_p95_ms": {phase: s.percentiles((0.95,))[0] for phase, s in phases.items()},
+    }
+    return result
+
+
+def report(result):
+    print(f"\n{result['map']} @ {result['commit']}: {result['frames']} frames, "
+          f"window {result['window'][0]}x{result['window'][1]}, render {result['render'][0]}x{result['render'][1]}")
+    print("frame ms  " + "  ".join(f"{k} {v:6.2f}" for k, v in result["frame_ms"].items())
+          + f"  mean {result['frame_mean_ms']:6.2f}")
+    print("phase        mean    p95")
+    for phase in FRAME_PHASES:
+        print(f"  {phase:<9} {result['phase_mean_ms'][phase]:6.2f} {result['phase_p95_ms'][phase]:6.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        map_name = sys.argv[1]
+    if len(sys.argv) > 2:
+        n_frames = int(sys.argv[2])
+    result = run(map_name, n_frames)
+    report(result)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, f"bench_{map_name}_{result['commit']}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote {path}")
@@ -1,6 +1,8 @@
 import pygame
 import math
 from game_config import *
+from render import to_render
+from simclock import sim_clock
 
 class Projectile:
     def __init__(self, x, y, angle, speed=10, damage=50): # Added default values
@@ -29,8 +31,7 @@ class Projectile:
                 break
 
     def draw(self, surface, camera):
-        # Using camera.apply().center directly for the drawing position
-        pygame.draw.circle(surface, (200, 200, 200), camera.apply(self.rect).center, 5)
+        surface.circle((200, 200, 200), self.rect.center, 5)
 
 
 class Cannon:
@@ -44,12 +45,12 @@ class Cannon:
         self.busy = False
         self.index = None
 
-    def update(self, camera, obstacles, enemies):
+    def update(self, camera, obstacles, enemies, mouse_pos):
         if self.mounted:
             # Handle aiming relative to world-space mouse
-            mx, my = pygame.mouse.get_pos()
-            world_mx = mx - camera.offset.x
-            world_my = my - camera.offset.y
+            mx, my = to_render(mouse_pos)
+            world_mx = (mx - camera.offset.x) / camera.scale
+            world_my = (my - camera.offset.y) / camera.scale
             self.angle = math.atan2(world_my - self.rect.centery, world_mx - self.rect.centerx)
 
         # Update all projectiles
@@ -59,7 +60,7 @@ class Cannon:
                 self.projectiles.remove(p)
 
     def shoot(self):
-        now = pygame.time.get_ticks()
+        now = sim_clock.ticks()
         if now - self.last_shot > self.shoot_cooldown:
             # FIX: Added speed and damage arguments (or used defaults from __init__)
             self.projectiles.append(Projectile(self.rect.centerx, self.rect.centery, self.angle))
@@ -68,20 +69,18 @@ class Cannon:
         else:
             return None
 
+    def dirty_rects(self):
+        return [(self.rect, 48)] + [(p.rect, 8) for p in self.projectiles] # barrel, shots
+
     def draw(self, surface, camera):
         # Draw the base
-        pygame.draw.rect(surface, (100, 100, 110), camera.apply(self.rect))
+        surface.rect((100, 100, 110), self.rect)
         
         # Draw the barrel
         end_x = self.rect.centerx + math.cos(self.angle) * 40
         end_y = self.rect.centery + math.sin(self.angle) * 40
         
-        # Convert world end-point to screen coordinates via camera
-        barrel_end = camera.apply(pygame.Rect(end_x, end_y, 0, 0)).topleft
-        
-        pygame.draw.line(surface, (20, 20, 20), 
-                         camera.apply(self.rect).center, 
-                         barrel_end, 8)
+        surface.line((20, 20, 20), self.rect.center, (end_x, end_y), 8)
         
         # Draw bullets
         for p in self.projectiles:
@@ -0,0 +1,20 @@
+import pygame
+
+HELD_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d) # keys the game reads as held, not as presses
+
+
+class Controls:
+    """What the player is holding during a frame, so the loop can be driven live or from a script."""
+    def __init__(self, keys=(), mouse_pos=(0, 0), mouse_buttons=(False, False, False)):
+        self.keys = frozenset(keys)
+        self.mouse_pos = mouse_pos
+        self.mouse_buttons = mouse_buttons
+
+    def held(self, key):
+        return key in self.keys
+
+    @classmethod
+    def live(cls):
+        """The real keyboard and mouse right now."""
+        pressed = pygame.key.get_pressed()
+        return cls([k for k in HELD_KEYS if pressed[k]], pygame.mouse.get_pos(), pygame.mouse.get_pressed()[:3])
@@ -0,0 +1,140 @@
+from rl import WorldEnv
+from student import StudentPolicy
+from stable_baselines3 import PPO
+import numpy as np
+import torch
+import torch.nn as nn
+
+import random
+import time
+
+# Distils the PPO teacher into a tiny MLP the game can run for every enemy every frame.
+# Run from the repo root: python distill.py
+
+teacher_path = "ai/modelSELF28/final"
+student_path = "ai/student.npz"
+hidden = (32, 32)
+
+# arena layouts the game actually builds (n_agents, size)
+arena_configs = [(1, (8, 8)), (2, (8, 8)), (4, (16, 8)), (3, (12, 12))]
+rollout_eps = 200
+train_epochs = 40
+batch_sz = 512
+lr = 3e-3
+eval_eps = 200
+latency_calls = 2000
+
+
+def rollout(teacher, n_eps):
+    """
+    Plays the teacher against itself in headless WorldEnvs and records its
+    deterministic action for every agent's observation.
+    """
+    obs_buf, act_buf = [], []
+    for ep in range(n_eps):
+        n_agents, size = random.choice(arena_configs)
+        env = WorldEnv(n_agents, size)
+        for _ in range(500):
+            obs = np.stack([env._get_obs(i) for i in range(env.n_players)])
+            if not np.isfinite(obs).all():
+                break # knockback divides by zero when two players sit on the same spot
+            target = teacher.predict(obs, deterministic=True)[0]
+            sampled = teacher.predict(obs, deterministic=False)[0]
+            alive = [i for i in range(env.n_players) if env.p[i].health > 0]
+            obs_buf.append(obs[alive])
+            act_buf.append(target[alive])
+            env.step(0, sampled[0], sampled[1:])
+            if env.p[0].health <= 0 or all(p.health <= 0 for p in env.p[1:]):
+                break
+    return np.concatenate(obs_buf), np.concatenate(act_buf)
+
+
+def train(obs, act):
+    obs_mean = obs.mean(axis=0)
+    obs_std = obs.std(axis=0) + 1e-6
+
+    layers = []
+    sizes = (obs.shape[1],) + hidden
+    for a, b in zip(sizes[:-1], sizes[1:]):
+        layers += [nn.Linear(a, b), nn.Tanh()]
+    layers.append(nn.Linear(sizes[-1], act.shape[1]))
+    net = nn.Sequential(*layers)
+
+    x = torch.tensor((obs - obs_mean) / obs_std, dtype=torch.float32)
+    y = torch.tensor(act, dtype=torch.float32)
+    opt = torch.optim.Adam(net.parameters(), lr=lr)
+    sched = torch.optim.lr_scheduler.CosineAnnealingLR(opt, train_epochs)
+    for epoch in range(train_epochs):
+        perm = torch.randperm(len(x))
+        total = 0.0
+        for i in range(0, len(x), batch_sz):
+            idx = perm[i:i + batch_sz]
+            loss = ((net(x[idx]) - y[idx]) ** 2).mean()
+            opt.zero_grad()
+            loss.backward()
+            opt.step()
+            total += loss.item() * len(idx)
+        sched.step()
+        print(f"epoch {epoch + 1}: mse {total / len(x):.4f}")
+
+    linears = [m for m in net if isinstance(m, nn.Linear)]
+    return ([m.weight.detach().numpy().T.copy() for m in linears],
+            [m.bias.detach().numpy().copy() for m in linears],
+            obs_mean.astype(np.float32), obs_std.astype(np.float32))
+
+
+def latency_ms(policy, obs):
+    start = time.perf_counter()
+    for _ in range(latency_calls):
+        policy.predict(obs, deterministic=False)
+    return (time.perf_counter() - start) / latency_calls * 1000
+
+
+def head_to_head(student, teacher, n_eps):
+    """
+    1v1 in an 8x8 arena, swapping sides every episode. Episodes that hit the
+    500 step limit go to whoever has more health left. Returns (student, teacher, draws).
+    """
+    wins = [0, 0, 0]
+    for ep in range(n_eps):
+        env = WorldEnv(1, (8, 8))
+        sides = (student, teacher) if ep % 2 == 0 else (teacher, student)
+        for _ in range(500):
+            if not (np.isfinite(env._get_obs(0)).all() and np.isfinite(env._get_obs(1)).all()):
+                break
+            a0 = sides[0].predict(env._get_obs(0), deterministic=False)[0]
+            a1 = sides[1].predict(env._get_obs(1), deterministic=False)[0]
+            env.step(0, a0, [a1])
+            if env.p[0].health <= 0 or env.p[1].health <= 0:
+                break
+        if env.p[0].health == env.p[1].health:
+            wins[2] += 1
+        else:
+            winner = sides[0] if env.p[0].health > env.p[1].health else sides[1]
+            wins[0 if winner is student else 1] += 1
+    return wins
+
+
+if __name__ == "__main__":
+    teacher = PPO.load(teacher_path, device="cpu")
+
+    print(f"Rolling out {teacher_path} for {rollout_eps} episodes")
+    obs, act = rollout(teacher, rollout_eps)
+    print(f"{len(obs)} samples")
+
+    weights, biases, obs_mean, obs_std = train(obs, act)
+    log_std = teacher.policy.log_std.detach().cpu().numpy()
+    student = StudentPolicy(weights, biases, obs_mean, obs_std, log_std)
+    student.save(student_path)
+
+    n_teacher = sum(p.numel() for p in teacher.policy.parameters())
+    n_student = sum(w.size + b.size for w, b in zip(weights, biases))
+    single = obs[:1][0]
+    batch = obs[:16]
+    print(f"\n===== {student_path} =====")
+    print(f"params      teacher {n_teacher:>8}   student {n_student:>8}")
+    print(f"latency x1  teacher {latency_ms(teacher, single):7.3f}ms  student {latency_ms(student, single):7.3f}ms")
+    print(f"latency x16 teacher {latency_ms(teacher, batch):7.3f}ms  student {latency_ms(student, batch):7.3f}ms")
+    s, t, d = head_to_head(student, teacher, eval_eps)
+    print(f"head to head over {eval_eps}: student {s}  teacher {t}  draws {d}  "
+          f"(student win rate {s / max(1, s + t):.0%} of decided)")
@@ -5,7 +5,10 @@ from game_config import *
 from abc import ABC, abstractmethod
 
 from ss import *
+from assets import load_spritesheet
+from render import LAYER_OVERLAY, sprite_size
 from animation import *
+from simclock import sim_clock
 
 
 def move_with_collision(rect, dx, dy, obstacles):
@@ -46,11 +49,11 @@ class Health:
             # Draw health bar relative to owner's position
             rect = self.owner_rect
             bar_bg = pygame.Rect(rect.x, rect.y - 12, rect.width, 6)
-            pygame.draw.rect(surface, (50, 0, 0), camera.apply(bar_bg))
+            surface.rect((50, 0, 0), bar_bg, layer=LAYER_OVERLAY)
             
             hp_ratio = self.current_hp / self.max_hp
             bar_fg = pygame.Rect(rect.x, rect.y - 12, rect.width * hp_ratio, 6)
-            pygame.draw.rect(surface, (0, 255, 0), camera.apply(bar_fg))
+            surface.rect((0, 255, 0), bar_fg, layer=LAYER_OVERLAY)
 
 class Enemy(ABC):
     @abstractmethod
@@ -79,7 +82,7 @@ class Grunt(Enemy):
         self.last_attack_time = 0
         self.health = Health(50, self.rect)
 
-        sps = Spritesheet('assets/bh/Ninja Adventure - Asset Pack/Actor/Characters/Cavegirl/SpriteSheet.png', 16)
+        sps = load_spritesheet('assets/bh/Ninja Adventure - Asset Pack/Actor/Characters/Cavegirl/SpriteSheet.png', 16)
         self.a = (Animation(sps, 5, [0]),)
 
     def is_active(self):
@@ -104,7 +107,7 @@ class Grunt(Enemy):
             # move_with_collision(self.rect, vx, vy, obstacles)
 
         if self.rect.colliderect(player.rect):
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.ticks()
             if current_time - self.last_attack_time > self.attack_cooldown:
                 player.take_damage(self.attack_damage)
                 self.last_attack_time = current_time
@@ -112,8 +115,6 @@ class Grunt(Enemy):
     def draw(self, surface, camera):
         # pygame.draw.rect(surface, self.color, camera.apply(self.rect))
 
-        bruh = camera.apply(self.rect)
-        img = self.a[0].get_image()
         # surface.blit(img, (bruh.x, bruh.y))
-        surface.blit(pygame.transform.scale(img, bruh.size), (bruh.x, bruh.y))
+        surface.blit(self.a[0].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft)
         self.health.draw(surface, camera)
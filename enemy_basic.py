@@ -6,7 +6,10 @@ import pygame
 from enemy import Enemy, Health, move_with_collision
 from game_config import TILE_SIZE
 from ss import *
+from assets import load_spritesheet
+from render import sprite_size
 from animation import *
+from simclock import sim_clock
 
 
 def _world_to_tile(point):
@@ -97,7 +100,7 @@ class Basic(Enemy):
         self.stuck_frames = 0
 
         # sps = Spritesheet('assets/bh/Ninja Adventure - Asset Pack/Actor/Animals/Cat/Faceset.png', 32)
-        sps = Spritesheet('assets/bh/Ninja Adventure - Asset Pack/Actor/Characters/Cavegirl/SpriteSheet.png', 16)
+        sps = load_spritesheet('assets/bh/Ninja Adventure - Asset Pack/Actor/Characters/Cavegirl/SpriteSheet.png', 16)
         self.a = (Animation(sps, 5, [0]),)
 
     def is_active(self):
@@ -134,12 +137,12 @@ class Basic(Enemy):
         blocked_tiles.discard(goal_tile)
 
         self.path = _find_path(start_tile, goal_tile, blocked_tiles, map_width, map_height)
-        self.last_path_update = pygame.time.get_ticks()
+        self.last_path_update = sim_clock.ticks()
         self.last_start_tile = start_tile
         self.last_goal_tile = goal_tile
 
     def _move_along_path(self, player, nav_data):
-        now = pygame.time.get_ticks()
+        now = sim_clock.ticks()
         current_tile = _world_to_tile(self.rect.center)
         goal_tile = _world_to_tile(player.rect.center)
 
@@ -215,15 +218,13 @@ class Basic(Enemy):
             self._move_direct(player, nav_or_obstacles)
 
         if self.rect.colliderect(player.rect):
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.ticks()
             if current_time - self.last_attack_time > self.attack_cooldown:
                 player.take_damage(self.attack_damage)
                 self.last_attack_time = current_time
 
     def draw(self, surface, camera):
         # pygame.draw.rect(surface, self.color, camera.apply(self.rect))
-        bruh = camera.apply(self.rect)
-        img = self.a[0].get_image()
         # surface.blit(img, (bruh.x, bruh.y))
-        surface.blit(pygame.transform.scale(img, bruh.size), (bruh.x, bruh.y))
+        surface.blit(self.a[0].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft)
         self.health.draw(surface, camera)
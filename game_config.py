@@ -6,7 +6,17 @@ pygame.init()
 screen_info = pygame.display.Info()
 
 SCREEN_WIDTH, SCREEN_HEIGHT = screen_info.current_w, screen_info.current_h
-FPS = 60
+RENDER_WIDTH = 960 # The world is drawn this wide and scaled up to the window. None draws at window size
+if RENDER_WIDTH is None or RENDER_WIDTH >= SCREEN_WIDTH:
+    RENDER_WIDTH, RENDER_HEIGHT = SCREEN_WIDTH, SCREEN_HEIGHT
+else:
+    RENDER_HEIGHT = round(SCREEN_HEIGHT * RENDER_WIDTH / SCREEN_WIDTH) # keep the window's aspect
+VIEW_SCALE = RENDER_WIDTH / SCREEN_WIDTH # the view still covers the window's worth of world, drawn smaller
+SMOOTH_UPSCALE = False # Filter the upscale so uneven scale factors don't give uneven pixels; ~3x the cost
+FPS = 60 # Simulation steps per second; PLAYER_SPEED and the AI's dt are per step
+SIM_STEP_MS = 1000 / FPS
+MAX_SIM_STEPS = 5 # Most steps run to catch up before drawing; any more lag is dropped
+RENDER_FPS = 120 # Cap on frames drawn per second, 0 for none
 PLAYER_SPEED = 5
 WHITE = (255, 255, 255)
 WALL_COLOR = (70, 70, 80)
@@ -20,9 +30,23 @@ OPEN_COLOR = (180, 190, 255)
 INTERACT_RANGE = 90
 MINICAM_DISPLAY_SIZE = 200
 MINICAM_CAPTURE_SIZE = 500
+MINICAM_REFRESH_HZ = 20
 LOCATION_INTERVAL = 1 # Record player location every LOCATION_INTERVAL frames for replay
-with open("maps/game_map.txt", "r") as f:
-    LEVEL_MAP = [line.strip() for line in f.readlines()]
+SESSION_LOGS = False # Write per-frame AI, frame phase and draw count CSVs to logs/
+PROFILE_FRAMES = 300 # How many frames F5 runs cProfile for
+MEMORY_TRACE = False # tracemalloc all session, snapshotting at every level load; slow. F6 traces between two presses
+DIRTY_RECTS = False # Present only changed screen regions while the camera is still
+AI_POLICY_PATH = "ai/student.npz" # distilled by distill.py, or an SB3 checkpoint like "ai/modelSELF28/final"
+AI_DECISION_HZ = 20 # How often each enemy in the visible room picks a new action
+ADAPTIVE_AI_BUDGET = True # Fewer AI decisions per step when frames run long; off keeps the sim independent of frame time
+
+
+def load_map(path):
+    with open(path, "r") as f:
+        return [line.strip() for line in f.readlines()]
+
+
+LEVEL_MAP = load_map("maps/game_map.txt")
 # if os.path.exists("map_select.txt"):
 #     with open("map_select.txt", "r") as f:
 #         LEVEL_MAP = [line.strip() for line in f.readlines()]
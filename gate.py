@@ -3,7 +3,10 @@ import math
 from game_config import *
 
 from ss import *
+from assets import load_spritesheet
+from render import sprite_size
 from animation import *
+from simclock import sim_clock
 
 pygame.font.init()
 DEBUG_FONT = pygame.font.SysFont('Arial', 20, bold=True)
@@ -33,29 +36,27 @@ class GateButton:
         self.text_surf = DEBUG_FONT.render(self.id.upper(), True, (255, 255, 255))
         self.text_rect = self.text_surf.get_rect()
         
-        sps = Spritesheet('assets/bb/button UI.png', 16)
+        sps = load_spritesheet('assets/bb/button UI.png', 16)
         pp = [24, 24 + 36, 24 + 2 * 36, 24 + 3 * 36, 30, 30 + 36, 30 + 72, 30 + 108]
         self.a = (Animation(sps, 5, [pp[bruh[self.id]]]),)
 
     def press(self):
-        self.pressed_timer = pygame.time.get_ticks()
+        self.pressed_timer = sim_clock.ticks()
 
     def is_active(self):
-        now = pygame.time.get_ticks()
+        now = sim_clock.ticks()
         return now - self.pressed_timer < self.duration
 
     def draw(self, surface, camera):
         # 1. Determine State and Color
         active = self.is_active()
         color = (0, 200, 0) if active else (150, 0, 0)
-        draw_rect = camera.apply(self.rect)
         
         # 2. Draw Button Base
-        img = self.a[0].get_image()
-        surface.blit(pygame.transform.scale(img, (draw_rect.width, draw_rect.height)), draw_rect)
+        surface.blit(self.a[0].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft)
         # surface.blit(img, (draw_rect.x, draw_rect.y))
         # pygame.draw.rect(surface, color, draw_rect)
-        pygame.draw.rect(surface, color, draw_rect, 2) # Dark border
+        surface.rect(color, self.rect, 2) # Dark border
 
         # 3. Draw ID Text (Centered)
         # self.text_rect.center = draw_rect.center
@@ -82,7 +83,7 @@ class Gate:
         self.text_surf = DEBUG_FONT.render(self.id, True, (255, 255, 255))
         self.text_rect = self.text_surf.get_rect()
 
-        sps = Spritesheet('assets/bb/button UI.png', 16)
+        sps = load_spritesheet('assets/bb/button UI.png', 16)
         # self.a = (Animation(sps, 5, [16]), Animation(sps, 5, [17]))
 
         pp1 = [16, 16 + 36, 16 + 2 * 36, 16 + 3 * 36,
@@ -106,8 +107,6 @@ class Gate:
         self.is_open = False
 
     def draw(self, surface, camera):
-        draw_rect = camera.apply(self.rect)
-        
         # current_color = OPEN_COLOR if self.is_open else CLOSED_COLOR
         # pygame.draw.rect(surface, current_color, draw_rect)
         # text_color = (255, 255, 255) if not self.is_open else (50, 50, 100)
@@ -117,8 +116,7 @@ class Gate:
         # border_color = (100, 100, 255) if self.is_open else (20, 20, 100)
         # pygame.draw.rect(surface, border_color, draw_rect, 2)
 
-        img = self.a[self.is_open].get_image()
-        surface.blit(pygame.transform.scale(img, (draw_rect.width, draw_rect.height)), draw_rect)
+        surface.blit(self.a[self.is_open].get_image(size=sprite_size(camera, self.rect.size)), self.rect.topleft)
 
         color = (0, 200, 0) if self.is_open else (150, 0, 0)
-        pygame.draw.rect(surface, color, draw_rect, 2) # Dark border
+        surface.rect(color, self.rect, 2) # Dark border
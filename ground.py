@@ -0,0 +1,215 @@
+import collections
+import math
+
+import pygame
+
+from game_config import BG_COLOR, TILE_SIZE
+from ss import *
+from assets import load_spritesheet
+from animation import *
+from render import LAYER_GROUND, LAYER_WORLD, RenderQueue
+from telemetry import draw_counts
+
+
+def tile_variant(xx, yy):
+    """Which of the 256 grass tiles sits at world tile (xx, yy)."""
+    return (xx + 377 * yy + 3 * xx * xx) % 256
+
+
+class GroundLayer:
+    """
+    The grass under everything, prebaked into chunk surfaces at the camera's scale,
+    built on demand and evicted least recently drawn first.
+    """
+    def __init__(self, view_size, scale=1, chunk_tiles=16):
+        self.chunk_tiles = chunk_tiles
+        self.chunk_px = chunk_tiles * TILE_SIZE
+        self.scale = scale
+        # neighbouring chunks land round(chunk_px * scale) +-1 apart, so round up to never leave a seam
+        self.scaled_px = math.ceil(self.chunk_px * scale)
+        cols = math.ceil(view_size[0] / self.chunk_px) + 2
+        rows = math.ceil(view_size[1] / self.chunk_px) + 2
+        self.max_chunks = cols * rows
+        self.chunks = collections.OrderedDict() # (cx, cy) -> Surface, least recently used first
+
+        self.sps = load_spritesheet('assets/ppp/Texture/TX Tileset Grass.png', 16)
+        self.tiles = {} # variant -> tile at TILE_SIZE, scaled the first time a chunk needs it
+
+    def build_chunk(self, cx, cy):
+        chunk = pygame.Surface((self.chunk_px, self.chunk_px)).convert()
+        chunk.fill(BG_COLOR)
+        draw_counts.add("ground", blits=self.chunk_tiles ** 2, surfaces=1, pixels=2 * self.chunk_px ** 2)
+        x0, y0 = cx * self.chunk_tiles, cy * self.chunk_tiles
+        for x in range(self.chunk_tiles):
+            for y in range(self.chunk_tiles):
+                chunk.blit(self.get_tile(tile_variant(x0 + x, y0 + y)), (x * TILE_SIZE, y * TILE_SIZE))
+        if self.scale != 1:
+            chunk = pygame.transform.scale(chunk, (self.scaled_px, self.scaled_px))
+            draw_counts.add("ground", transforms=1, surfaces=1)
+        return chunk
+
+    def get_tile(self, variant):
+        tile = self.tiles.get(variant)
+        if tile is None:
+            tile = self.tiles[variant] = self.sps.get_variant(variant, (TILE_SIZE, TILE_SIZE))
+        return tile
+
+    def get_chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.build_chunk(*key)
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def chunk_range(self, rect):
+        return (range(rect.left // self.chunk_px, (rect.right - 1) // self.chunk_px + 1),
+                range(rect.top // self.chunk_px, (rect.bottom - 1) // self.chunk_px + 1))
+
+    def draw(self, queue, camera):
+        xs, ys = self.chunk_range(camera.view_rect)
+        for cx in xs:
+            for cy in ys:
+                queue.blit(self.get_chunk((cx, cy)), (cx * self.chunk_px, cy * self.chunk_px), LAYER_GROUND)
+
+        # build at most one chunk a frame within half a chunk of the view,
+        # which max_chunks always has room for
+        xs, ys = self.chunk_range(camera.view_rect.inflate(self.chunk_px, self.chunk_px))
+        for cx in xs:
+            for cy in ys:
+                if (cx, cy) not in self.chunks:
+                    self.get_chunk((cx, cy))
+                    return
+
+
+class _ChunkCamera:
+    """Just enough of a Camera to let objects draw themselves into a chunk."""
+    scale = 1
+
+    def __init__(self, origin):
+        self.offset = pygame.Vector2(-origin[0], -origin[1])
+
+    def apply(self, target_rect):
+        return target_rect.move(self.offset)
+
+
+STATIC_COLORKEY = (255, 0, 255)
+
+
+class StaticLayer:
+    """Walls and the goal, baked into colorkeyed RLE chunk surfaces at each scale they're drawn at."""
+    def __init__(self, objects, scale=1, chunk_tiles=16):
+        self.chunk_px = chunk_tiles * TILE_SIZE
+        self.cells = {} # (cx, cy) -> objects touching that chunk
+        self.scaled = {} # scale -> {(cx, cy) -> Surface}, baked the first time that scale is drawn
+        self.rect = objects[0].rect.unionall([o.rect for o in objects]) if objects else pygame.Rect(0, 0, 0, 0)
+        for obj in objects:
+            r = obj.rect
+            for cx in range(r.left // self.chunk_px, (r.right - 1) // self.chunk_px + 1):
+                for cy in range(r.top // self.chunk_px, (r.bottom - 1) // self.chunk_px + 1):
+                    self.cells.setdefault((cx, cy), []).append(obj)
+        self.chunks_at(scale) # the main view's, at load; other scales wait until they're drawn
+
+    def bake(self, key, objects, scale):
+        chunk = pygame.Surface((self.chunk_px, self.chunk_px)).convert()
+        chunk.fill(STATIC_COLORKEY)
+        draw_counts.add("static", surfaces=1, pixels=self.chunk_px ** 2)
+        queue = RenderQueue("static")
+        camera = _ChunkCamera((key[0] * self.chunk_px, key[1] * self.chunk_px))
+        for obj in objects:
+            obj.draw(queue, camera)
+        queue.flush(chunk, camera)
+        if scale != 1:
+            # plain scale so the colorkey stays exact; rounded up like GroundLayer so chunks never leave a seam
+            size = math.ceil(self.chunk_px * scale)
+            chunk = pygame.transform.scale(chunk, (size, size))
+            draw_counts.add("static", transforms=1, surfaces=1)
+        chunk.set_colorkey(STATIC_COLORKEY, pygame.RLEACCEL)
+        return chunk
+
+    def chunks_at(self, scale):
+        """The chunks for a camera at scale, baked the first time that scale is asked for."""
+        chunks = self.scaled.get(scale)
+        if chunks is None:
+            chunks = self.scaled[scale] = {key: self.bake(key, objects, scale) for key, objects in self.cells.items()}
+        return chunks
+
+    def dirty_rects(self):
+        return [] # never changes
+
+    def draw(self, queue, camera):
+        view = camera.view_rect
+        chunks = self.chunks_at(camera.scale)
+        for cx in range(view.left // self.chunk_px, (view.right - 1) // self.chunk_px + 1):
+            for cy in range(view.top // self.chunk_px, (view.bottom - 1) // self.chunk_px + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk is not None:
+                    queue.blit(chunk, (cx * self.chunk_px, cy * self.chunk_px), LAYER_WORLD)
+
+
+def _merge_tiles(rects):
+    """Merges tile rects into rectangles: runs along each row, then equal runs down columns."""
+    tiles = {(r.x // TILE_SIZE, r.y // TILE_SIZE) for r in rects}
+    runs = [] # [x, y, w, h] in tiles
+    for y in sorted({t[1] for t in tiles}):
+        xs = sorted(t[0] for t in tiles if t[1] == y)
+        start = xs[0]
+        for a, b in zip(xs, xs[1:] + [None]):
+            if b != a + 1:
+                runs.append([start, y, a - start + 1, 1])
+                start = b
+    merged = []
+    for run in runs:
+        for m in merged:
+            if m[0] == run[0] and m[2] == run[2] and m[1] + m[3] == run[1]:
+                m[3] += 1
+                break
+        else:
+            merged.append(run)
+    return [pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, w * TILE_SIZE, h * TILE_SIZE) for x, y, w, h in merged]
+
+
+class WaterOverlay:
+    """Animated water, one blit per water region, with frames pre-tiled across each region."""
+    def __init__(self, waters):
+        self.regions = [] # (rect, [Surface per animation frame])
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        if not waters:
+            return
+        self.anim = waters[0].a[2]
+        frames = [self.anim.get_image(over=i, size=(TILE_SIZE, TILE_SIZE)) for i in range(len(self.anim.indices))]
+        for region in _merge_tiles([w.rect for w in waters]):
+            tiled = []
+            for frame in frames:
+                surf = pygame.Surface(region.size).convert() # water frames are opaque
+                draw_counts.add("water", surfaces=1)
+                for x in range(0, region.width, TILE_SIZE):
+                    for y in range(0, region.height, TILE_SIZE):
+                        surf.blit(frame, (x, y))
+                tiled.append(surf)
+            self.regions.append((region, tiled))
+        self.scaled = {} # scale -> [[Surface per animation frame] per region]
+        self.rect = self.regions[0][0].unionall([r for r, _ in self.regions])
+
+    def frames_at(self, scale):
+        if scale == 1:
+            return [tiled for _, tiled in self.regions]
+        frames = self.scaled.get(scale)
+        if frames is None:
+            frames = self.scaled[scale] = [
+                [pygame.transform.scale(surf, (math.ceil(region.w * scale), math.ceil(region.h * scale))) for surf in tiled]
+                for region, tiled in self.regions]
+            n = sum(len(tiled) for tiled in frames)
+            draw_counts.add("water", transforms=n, surfaces=n)
+        return frames
+
+    def dirty_rects(self):
+        return [(region, 0) for region, _ in self.regions]
+
+    def draw(self, queue, camera):
+        idx = animation_clock.position(self.anim)
+        for (region, _), tiled in zip(self.regions, self.frames_at(camera.scale)):
+            if camera.view_rect.colliderect(region):
+                queue.blit(tiled[idx], region.topleft, LAYER_WORLD)
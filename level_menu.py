@@ -8,6 +8,7 @@ import pygame
 
 from game_config import SCREEN_HEIGHT, SCREEN_WIDTH
 from music_select import *
+from present import Presenter
 
 
 MENU_BG = (22, 24, 31)
@@ -142,7 +143,6 @@ def draw_home_screen(screen, background, title_font, item_font):
         (button_rect.centerx - button_text.get_width() // 2, button_rect.y + 18),
     )
 
-    pygame.display.flip()
     return button_rect
 
 
@@ -221,8 +221,6 @@ def draw_menu(screen, title_font, item_font, small_font, options, selected_index
     screen.blit(preview_title, (preview_area.x + 18, preview_area.y - 42))
     draw_map_preview(screen, preview_area, selected_option.get("grid", []))
 
-    pygame.display.flip()
-
 
 def main():
     pygame.display.init()
@@ -241,18 +239,28 @@ def main():
     options = discover_maps()
     selected_index = 0
     view = "home"
+    presenter = Presenter()
+    drawn_state = None
+    home_button = None
 
     running = True
     while running:
-        home_button = None
-        if view == "home":
-            home_button = draw_home_screen(screen, home_background, title_font, item_font)
-        else:
-            draw_menu(screen, title_font, item_font, small_font, options, selected_index)
+        # In dirty-rect mode the menu is only redrawn when something on it changed
+        state = (view, selected_index)
+        if not presenter.enabled or state != drawn_state:
+            if view == "home":
+                home_button = draw_home_screen(screen, home_background, title_font, item_font)
+            else:
+                draw_menu(screen, title_font, item_font, small_font, options, selected_index)
+            presenter.mark_full()
+            drawn_state = state
+        presenter.present()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                drawn_state = None
             elif view == "home":
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
@@ -282,6 +290,7 @@ def main():
                         home_background = load_menu_background()
                         options = discover_maps()
                         view = "levels"
+                        drawn_state = None
 
         clock.tick(60)
 
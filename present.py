@@ -0,0 +1,61 @@
+import pygame
+
+from game_config import DIRTY_RECTS
+from render import to_window
+
+SPRITE_PAD = 128 # sprites and health bars can spill this far past an object's rect
+DIRTY_PAD = 40 # what a drawable without dirty_rects() can spill: health bars and AI attack markers
+
+
+class Presenter:
+    """
+    Puts finished frames on screen: a full flip, or with DIRTY_RECTS on, display.update()
+    over the regions that changed this frame or last.
+    """
+    def __init__(self, enabled=DIRTY_RECTS):
+        self.enabled = enabled
+        self.rects = []
+        self.prev_rects = []
+        self.full = True
+        self.camera_pos = None
+
+    def mark(self, rect):
+        if self.enabled:
+            self.rects.append(pygame.Rect(rect))
+
+    def mark_world(self, camera, rect, pad=0):
+        if self.enabled:
+            self.rects.append(to_window(camera.apply(rect).inflate(pad * 2, pad * 2)))
+
+    def mark_drawables(self, camera, drawables, sprites=()):
+        """
+        Marks every region of these that can change between frames while the camera holds still.
+        Drawables can say which with dirty_rects() -> [(world rect, pad)], otherwise their rect is padded.
+        """
+        if not self.enabled:
+            return
+        for obj in drawables:
+            dirty_rects = getattr(obj, "dirty_rects", None)
+            for rect, pad in dirty_rects() if dirty_rects else [(obj.rect, DIRTY_PAD)]:
+                self.mark_world(camera, rect, pad)
+        for sprite in sprites:
+            self.mark_world(camera, sprite.rect, SPRITE_PAD)
+
+    def mark_full(self):
+        self.full = True
+
+    def track_camera(self, camera):
+        pos = (camera.offset.x, camera.offset.y)
+        if pos != self.camera_pos:
+            self.camera_pos = pos
+            self.full = True
+
+    def present(self):
+        if not self.enabled or self.full:
+            pygame.display.flip()
+        elif self.rects or self.prev_rects:
+            screen_rect = pygame.display.get_surface().get_rect()
+            pygame.display.update([r.clip(screen_rect) for r in self.rects + self.prev_rects])
+        self.prev_rects = self.rects
+        self.rects = []
+        self.full = False
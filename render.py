@@ -0,0 +1,140 @@
+import pygame
+
+from game_config import RENDER_HEIGHT, RENDER_WIDTH, SCREEN_WIDTH, SMOOTH_UPSCALE
+from telemetry import draw_counts
+
+# z-order, back to front
+LAYER_GROUND = 0
+LAYER_WORLD = 1 # walls, water, goal
+LAYER_OBJECTS = 2 # doors, buttons, gates, enemies, cannons
+LAYER_ACTORS = 3 # ghosts and the player
+LAYER_OVERLAY = 4 # health bars and AI markers
+N_LAYERS = 5
+
+
+class RenderQueue:
+    """
+    Collects a frame's sprites and shapes and draws them per layer, back to front, with one
+    Surface.blits each. Images are expected at the camera's scale already.
+    """
+    def __init__(self, name="world"): # name: the subsystem its draws are counted under
+        self.name = name
+        self.sprites = [[] for _ in range(N_LAYERS)] # [(image, wx, wy, dx, dy)]
+        self.shapes = [[] for _ in range(N_LAYERS)] # [(kind, color, world coords, width)]
+
+    def blit(self, image, pos, layer=LAYER_OBJECTS, nudge=(0, 0)): # nudge: screen-space shift for sprites drawn off their rect
+        self.sprites[layer].append((image, pos[0], pos[1], nudge[0], nudge[1]))
+
+    def rect(self, color, rect, width=0, layer=LAYER_OBJECTS):
+        self.shapes[layer].append(("rect", color, pygame.Rect(rect), width))
+
+    def line(self, color, start, end, width=1, layer=LAYER_OBJECTS):
+        self.shapes[layer].append(("line", color, (start, end), width))
+
+    def circle(self, color, center, radius, layer=LAYER_OBJECTS):
+        self.shapes[layer].append(("circle", color, (center, radius), 0))
+
+    def arc(self, color, rect, start_angle, stop_angle, width=1, layer=LAYER_OBJECTS):
+        self.shapes[layer].append(("arc", color, (pygame.Rect(rect), start_angle, stop_angle), width))
+
+    def flush(self, surface, camera):
+        """Draws everything queued onto surface as seen through camera and empties the queue."""
+        s = camera.scale
+        ox, oy = camera.offset
+        blits = pixels = 0
+        for layer in range(N_LAYERS):
+            sprites = self.sprites[layer]
+            if sprites:
+                blits += len(sprites)
+                pixels += sum(img.get_width() * img.get_height() for img, *_ in sprites)
+                if s == 1:
+                    surface.blits([(img, (wx + dx + ox, wy + dy + oy)) for img, wx, wy, dx, dy in sprites], False)
+                else:
+                    surface.blits([(img, (round(wx * s + dx + ox), round(wy * s + dy + oy)))
+                                   for img, wx, wy, dx, dy in sprites], False)
+                sprites.clear()
+            shapes = self.shapes[layer]
+            blits += len(shapes)
+            for kind, color, coords, width in shapes:
+                if width:
+                    width = max(1, round(width * s))
+                if kind == "rect":
+                    r = pygame.draw.rect(surface, color, camera.apply(coords), width)
+                    if not width:
+                        pixels += r.w * r.h
+                elif kind == "line":
+                    (x0, y0), (x1, y1) = coords
+                    pygame.draw.line(surface, color, (x0 * s + ox, y0 * s + oy), (x1 * s + ox, y1 * s + oy), width)
+                elif kind == "circle":
+                    (x, y), radius = coords
+                    pygame.draw.circle(surface, color, (x * s + ox, y * s + oy), max(1, radius * s))
+                else:
+                    rect, start_angle, stop_angle = coords
+                    pygame.draw.arc(surface, color, camera.apply(rect), start_angle, stop_angle, width)
+            shapes.clear()
+        draw_counts.add(self.name, blits=blits, pixels=pixels)
+
+
+def sprite_size(camera, size):
+    """Size in pixels that something `size` big in the world comes out at through camera."""
+    if camera.scale == 1:
+        return size
+    return (round(size[0] * camera.scale), round(size[1] * camera.scale))
+
+
+class Interpolator:
+    """
+    Moves rects part way between their last two sim positions for drawing;
+    restore() must put them back before the next step.
+    """
+    def __init__(self):
+        self.prev = {} # object -> rect.topleft before the last step
+        self.saved = [] # (object, real topleft) while lerped
+
+    def snapshot(self, objs):
+        self.prev = {obj: obj.rect.topleft for obj in objs}
+
+    def lerp(self, alpha):
+        for obj, (px, py) in self.prev.items():
+            x, y = obj.rect.topleft
+            self.saved.append((obj, (x, y)))
+            obj.rect.topleft = (round(px + (x - px) * alpha), round(py + (y - py) * alpha))
+
+    def restore(self):
+        for obj, pos in self.saved:
+            obj.rect.topleft = pos
+        self.saved = []
+
+
+def to_render(pos):
+    """Window position (e.g. the mouse) to the matching spot on the render buffer."""
+    return (pos[0] * RENDER_WIDTH / SCREEN_WIDTH, pos[1] * RENDER_WIDTH / SCREEN_WIDTH)
+
+
+def to_window(rect):
+    """Render buffer rect to the window rect it ends up covering."""
+    if RENDER_WIDTH == SCREEN_WIDTH:
+        return pygame.Rect(rect)
+    f = SCREEN_WIDTH / RENDER_WIDTH
+    rect = pygame.Rect(rect)
+    return pygame.Rect(int(rect.x * f), int(rect.y * f), int(rect.w * f) + 2, int(rect.h * f) + 2)
+
+
+class RenderBuffer:
+    """The RENDER_WIDTH x RENDER_HEIGHT buffer the world is drawn into and scaled up to the window from."""
+    def __init__(self, window):
+        self.window = window
+        if window.get_size() == (RENDER_WIDTH, RENDER_HEIGHT):
+            self.surface = window
+        else:
+            self.surface = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT)).convert()
+
+    def clear(self, color):
+        self.surface.fill(color)
+        draw_counts.add("world", pixels=RENDER_WIDTH * RENDER_HEIGHT)
+
+    def upscale(self):
+        if self.surface is not self.window:
+            scale = pygame.transform.smoothscale if SMOOTH_UPSCALE else pygame.transform.scale
+            scale(self.surface, self.window.get_size(), self.window)
+            draw_counts.add("present", transforms=1, pixels=self.window.get_width() * self.window.get_height())
@@ -1,11 +1,17 @@
 from game_config import *
+from present import Presenter, SPRITE_PAD
+from assets import render_text
+from render import LAYER_ACTORS, RenderQueue, sprite_size
+from animation import animation_clock
+from telemetry import draw_counts
 import pygame
 
 
-def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
+def replay_reverse(buffer, history, scene, camera, player, ghosts=None):
     """
     Fast-forwards the current run's history in reverse.
     Draws the environment, the player's animations, and rewinds active ghosts.
+    The world and the VHS effect go into the RenderBuffer, the HUD onto the window.
     """
     if not history or not history["locations"]:
         return
@@ -14,11 +20,18 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
     loc_frames = sorted(history["locations"].keys(), reverse=True)
     max_frames = len(loc_frames)
     clock = pygame.time.Clock()
+    presenter = Presenter()
+    queue = RenderQueue("rewind")
 
-    # Create a persistent surface for scanlines to save performance
-    scanline_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for y in range(0, SCREEN_HEIGHT, 4):
-        pygame.draw.line(scanline_surf, (0, 0, 0, 40), (0, y), (SCREEN_WIDTH, y))
+    screen = buffer.window
+    world = buffer.surface
+
+    # Create persistent surfaces for scanlines and the tint to save performance
+    scanline_surf = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
+    for y in range(0, RENDER_HEIGHT, 4):
+        pygame.draw.line(scanline_surf, (0, 0, 0, 40), (0, y), (RENDER_WIDTH, y))
+    overlay = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((255, 0, 0, 20)) # Very faint red tint
 
     i = 0
     while i < max_frames:
@@ -32,6 +45,8 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE: return
 
+        animation_clock.advance()
+
         # Identify current frame and position for the Player
         frame = loc_frames[i]
         pos = history["locations"][frame]
@@ -42,13 +57,14 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
         
         rewind_rect = pygame.Rect(pos[0], pos[1], 40, 40)
         camera.update(type('obj', (object,), {'rect': rewind_rect}))
+        presenter.track_camera(camera)
 
-        screen.fill(BG_COLOR)
+        buffer.clear(BG_COLOR)
         
         # Draw the world state
-        for obj in all_drawables:
-            if camera.view_rect.colliderect(obj.rect):
-                obj.draw(screen, camera)
+        visible = scene.query(camera.view_rect)
+        for obj in visible:
+            obj.draw(queue, camera)
         
         # --- DRAW REWINDING PLAYER ---
         # 1. Select the correct animation set based on orientation
@@ -57,14 +73,15 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
         else: bb = player.right
         
         # 2. Get the image and flip if facing left
-        img = bb[idle].get_image()
-        if orit == 1:
-            img = pygame.transform.flip(img, True, False)
-            
-        # 3. Blit the player image using your offset logic
-        drawn_rect = camera.apply(rewind_rect)
+        anim = bb[idle]
+        size = None
+        if camera.scale != 1:
+            size = sprite_size(camera, (anim.sp.tilesize, anim.sp.tilesize))
+        img = anim.get_image(size=size, flip=orit == 1)
+
+        # 3. Queue the player image using your offset logic
         img_size = img.get_size()
-        screen.blit(img, (drawn_rect.x - img_size[0] / 4, drawn_rect.y - img_size[1] / 2))
+        queue.blit(img, rewind_rect.topleft, LAYER_ACTORS, (-img_size[0] / 4, -img_size[1] / 2))
 
         # --- DRAW REWINDING GHOSTS ---
         if ghosts:
@@ -76,24 +93,24 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
                     ghost.orit, ghost.idle = ghost.sequence["animations"][frame]
                 
                 # Draw the ghost (this will use the tinting logic we added earlier)
-                ghost.draw(screen, camera)
+                ghost.draw(queue, camera)
+        queue.flush(world, camera)
 
         # --- REPLAY OVERLAY LAYER ---
         
         # 2. Draw Scanlines (VHS Effect)
-        screen.blit(scanline_surf, (0, 0))
+        world.blit(scanline_surf, (0, 0))
 
         # 3. Tint the screen slightly red/blue
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((255, 0, 0, 20)) # Very faint red tint
-        screen.blit(overlay, (0, 0))
+        world.blit(overlay, (0, 0))
+        draw_counts.add("rewind", blits=2, pixels=2 * RENDER_WIDTH * RENDER_HEIGHT)
+        buffer.upscale()
 
         # 4. HUD Text & Rewind Icon
-        font = pygame.font.SysFont("Courier", 40, bold=True)
         # Flickering effect using frame count
         if (i // 2) % 2 == 0:
-            text = font.render("<< REWIND", True, (255, 255, 255))
-            screen.blit(text, (30, 30))
+            text = render_text("Courier", 40, "<< REWIND", (255, 255, 255), bold=True)
+            presenter.mark(screen.blit(text, (30, 30)))
         
         # 5. Progress Bar at the bottom
         bar_width = SCREEN_WIDTH - 100
@@ -102,8 +119,11 @@ def replay_reverse(screen, history, all_drawables, camera, player, ghosts=None):
         
         pygame.draw.rect(screen, (50, 50, 50), (50, SCREEN_HEIGHT - 50, bar_width, 10))
         pygame.draw.rect(screen, (255, 255, 255), (50, SCREEN_HEIGHT - 50, fill_width, 10))
+        presenter.mark((50, SCREEN_HEIGHT - 50, bar_width, 10))
 
-        pygame.display.flip()
+        presenter.mark_drawables(camera, visible, ghosts or [])
+        presenter.mark_world(camera, rewind_rect, SPRITE_PAD)
+        presenter.present()
         clock.tick(0.5 * FPS)
         i += REPLAY_SPEED
 
@@ -118,17 +138,13 @@ def save_menu(screen, history, saved_slots):
     overlay.fill((0, 0, 0))
     screen.blit(overlay, (0, 0))
 
-    # 2. Setup fonts
-    font = pygame.font.SysFont(None, 48)
-    small_font = pygame.font.SysFont(None, 36)
-
-    # 3. Render text surfaces
-    title_surf = font.render("Run Ended! Save this sequence?", True, (255, 255, 255))
-    slot1_surf = small_font.render("Press '1' to save to Slot 1", True, (200, 255, 200))
-    slot2_surf = small_font.render("Press '2' to save to Slot 2", True, (200, 255, 200))
-    skip_surf  = small_font.render("Press 'ESC' to discard and restart", True, (255, 150, 150))
+    # 2. Render text surfaces (cached after the first run)
+    title_surf = render_text(None, 48, "Run Ended! Save this sequence?", (255, 255, 255))
+    slot1_surf = render_text(None, 36, "Press '1' to save to Slot 1", (200, 255, 200))
+    slot2_surf = render_text(None, 36, "Press '2' to save to Slot 2", (200, 255, 200))
+    skip_surf  = render_text(None, 36, "Press 'ESC' to discard and restart", (255, 150, 150))
 
-    # 4. Blit text to the center of the screen
+    # 3. Blit text to the center of the screen
     center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
     screen.blit(title_surf, (center_x - title_surf.get_width() // 2, center_y - 100))
     screen.blit(slot1_surf, (center_x - slot1_surf.get_width() // 2, center_y - 20))
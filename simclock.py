@@ -0,0 +1,20 @@
+from game_config import SIM_STEP_MS
+
+
+class SimClock:
+    """
+    Game time, advanced one SIM_STEP_MS per simulation step. Gameplay timers read ticks()
+    instead of pygame.time.get_ticks() so they follow the sim rather than the wall clock.
+    """
+    def __init__(self):
+        self.steps = 0
+
+    def advance(self):
+        self.steps += 1
+
+    def ticks(self):
+        """Milliseconds of game time so far, like pygame.time.get_ticks()."""
+        return int(self.steps * SIM_STEP_MS)
+
+
+sim_clock = SimClock()
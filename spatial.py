@@ -0,0 +1,67 @@
+from game_config import TILE_SIZE
+
+
+class SpatialIndex:
+    """
+    Drawables bucketed by the cells their rect touches, so "what's in this rect" only
+    looks at the buckets under it. Results come back in draw order.
+    """
+    def __init__(self, cell_tiles=4, max_cells=64):
+        self.cell = cell_tiles * TILE_SIZE
+        self.max_cells = max_cells
+        self.buckets = {} # (cx, cy) -> set of objects
+        self.cells = {} # object -> (x range, y range) it's bucketed under
+        self.order = {} # object -> insertion number
+        self.added = 0
+        self.large = [] # objects too big to bucket
+
+    def cell_range(self, rect):
+        c = self.cell
+        return (range(rect.left // c, (rect.right - 1) // c + 1),
+                range(rect.top // c, (rect.bottom - 1) // c + 1))
+
+    def add(self, obj):
+        self.order[obj] = self.added
+        self.added += 1
+        xs, ys = self.cell_range(obj.rect)
+        if len(xs) * len(ys) > self.max_cells:
+            self.large.append(obj)
+            return
+        self.cells[obj] = (xs, ys)
+        for cx in xs:
+            for cy in ys:
+                self.buckets.setdefault((cx, cy), set()).add(obj)
+
+    def remove(self, obj):
+        self.order.pop(obj, None)
+        if obj in self.large:
+            self.large.remove(obj)
+            return
+        xs, ys = self.cells.pop(obj)
+        for cx in xs:
+            for cy in ys:
+                self.buckets[(cx, cy)].discard(obj)
+
+    def move(self, obj):
+        """Re-buckets obj after its rect changed. Cheap when it stayed in the same cells."""
+        cells = self.cells.get(obj)
+        if cells is None or cells == self.cell_range(obj.rect):
+            return
+        n = self.order[obj]
+        self.remove(obj)
+        self.add(obj)
+        self.order[obj] = n
+
+    def query(self, rect):
+        """Everything whose rect intersects rect, in draw order."""
+        found = set()
+        xs, ys = self.cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                bucket = self.buckets.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = [obj for obj in found if rect.colliderect(obj.rect)]
+        hits += [obj for obj in self.large if rect.colliderect(obj.rect)]
+        hits.sort(key=self.order.__getitem__)
+        return hits
@@ -1,4 +1,5 @@
 import pygame
+from telemetry import draw_counts
 # from config import *
 
 class Spritesheet:
@@ -10,11 +11,32 @@ class Spritesheet:
         self.w = width // self.tilesize
         self.h = height // self.tilesize
 
+        self.frames = {} # idx -> frame, a subsurface view into the sheet, sliced on first use
+        self.variants = {} # (idx, size, flip) -> scaled/flipped frame, made once
+
     def get_image(self, x, y):
-        sprite = pygame.Surface((self.tilesize, self.tilesize), pygame.SRCALPHA, 32).convert_alpha()
-        sprite.blit(self.spritesheet, (0, 0), 
-                    (x * self.tilesize, y * self.tilesize, self.tilesize, self.tilesize))
-        return sprite
+        # shares pixels with the sheet, nothing is copied
+        draw_counts.add("sprites", surfaces=1)
+        return self.spritesheet.subsurface((x * self.tilesize, y * self.tilesize, self.tilesize, self.tilesize))
 
     def get_image_idx(self, idx):
         return self.get_image(idx % self.w, idx // self.w)
+
+    def get_frame(self, idx):
+        frame = self.frames.get(idx)
+        if frame is None:
+            frame = self.frames[idx] = self.get_image_idx(idx)
+        return frame
+
+    def get_variant(self, idx, size=None, flip=False):
+        key = (idx, tuple(size) if size is not None else None, flip)
+        img = self.variants.get(key)
+        if img is None:
+            img = self.get_frame(idx)
+            if size is not None:
+                img = pygame.transform.scale(img, size)
+            if flip:
+                img = pygame.transform.flip(img, True, False)
+            img = self.variants[key] = img.convert_alpha()
+            draw_counts.add("sprites", transforms=(size is not None) + flip, surfaces=1 + (size is not None) + flip)
+        return img
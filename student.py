@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class StudentPolicy:
+    """
+    Small MLP distilled from a PPO teacher (see distill.py), run in plain numpy.
+    predict() matches the SB3 signature so it can stand in for the PPO model in game.
+    """
+    def __init__(self, weights, biases, obs_mean, obs_std, log_std):
+        self.weights = weights
+        self.biases = biases
+        self.obs_mean = obs_mean
+        self.obs_std = obs_std
+        self.std = np.exp(log_std)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        n_layers = int(data["n_layers"])
+        return cls([data[f"w{i}"] for i in range(n_layers)],
+                   [data[f"b{i}"] for i in range(n_layers)],
+                   data["obs_mean"], data["obs_std"], data["log_std"])
+
+    def save(self, path):
+        layers = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            layers[f"w{i}"] = w
+            layers[f"b{i}"] = b
+        np.savez(path, n_layers=len(self.weights), obs_mean=self.obs_mean, obs_std=self.obs_std,
+                 log_std=np.log(self.std), **layers)
+
+    def forward(self, obs):
+        x = (np.asarray(obs, dtype=np.float32) - self.obs_mean) / self.obs_std
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            x = np.tanh(x @ w + b)
+        return x @ self.weights[-1] + self.biases[-1]
+
+    def predict(self, obs, deterministic=False):
+        action = self.forward(obs)
+        if not deterministic:
+            # same gaussian exploration the teacher samples with
+            action = action + np.random.normal(size=action.shape) * self.std
+        return np.clip(action, -1.0, 1.0).astype(np.float32), None
+
+
+def load_policy(path):
+    """Loads a distilled .npz student, or falls back to an SB3 PPO checkpoint."""
+    if path.endswith(".npz"):
+        return StudentPolicy.load(path)
+    from stable_baselines3 import PPO
+    return PPO.load(path)
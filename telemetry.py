@@ -0,0 +1,362 @@
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+import types
+
+import pygame
+
+from game_config import SESSION_LOGS
+
+AI_PHASES = ("obs", "inference", "step", "sync")
+FRAME_PHASES = ("events", "ghosts", "player", "ai", "world", "ground", "drawables", "minimap", "hud", "flip")
+DRAW_COUNTS = ("blits", "transforms", "surfaces", "pixels")
+LOG_DIR = "logs"
+
+
+class RollingStats:
+    """Keeps the last `window` samples and reports percentiles over them."""
+    def __init__(self, window):
+        self.values = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self.values.append(value)
+
+    def percentiles(self, qs=(0.5, 0.95, 0.99)):
+        if not self.values:
+            return tuple(0.0 for _ in qs)
+        s = sorted(self.values)
+        return tuple(s[min(len(s) - 1, int(q * len(s)))] for q in qs)
+
+
+def open_session_log(prefix, header):
+    """Opens logs/<prefix>_<timestamp>.csv and writes the header row."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, f"{prefix}_{time.strftime('%Y%m%d-%H%M%S')}.csv")
+    log = open(path, "w")
+    log.write(",".join(header) + "\n")
+    print(f"Logging {prefix} to {path}")
+    return log
+
+
+def draw_panel(surface, font, lines, **anchor):
+    """Draws lines of text on a translucent panel placed by a Rect anchor (e.g. topright=...)."""
+    line_h = font.get_linesize()
+    width = max(font.size(line)[0] for line in lines) + 20
+    panel = pygame.Surface((width, line_h * len(lines) + 20), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        panel.blit(font.render(line, True, (220, 255, 220)), (10, 10 + i * line_h))
+    area = panel.get_width() * panel.get_height()
+    draw_counts.add("overlay", blits=len(lines) + 1, surfaces=len(lines) + 1, pixels=area * 2)
+    return surface.blit(panel, panel.get_rect(**anchor))
+
+
+class Overlay:
+    """A debug panel toggled from the keyboard, with an optional per-frame CSV log."""
+    def __init__(self, log=SESSION_LOGS):
+        self.logging = log
+        self.visible = False
+        self.log = None
+        self.font = None
+
+    def log_row(self, prefix, header, row):
+        if not self.logging:
+            return
+        if self.log is None:
+            self.log = open_session_log(prefix, header)
+        self.log.write(",".join(row) + "\n")
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, surface):
+        """Draws the panel if it's toggled on and returns the rect it covered."""
+        if not self.visible:
+            return None
+        if self.font is None:
+            self.font = pygame.font.SysFont("Courier", 16)
+        return draw_panel(surface, self.font, self.lines(), **self.anchor(surface))
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+class AITelemetry(Overlay):
+    """Per-room AI timings (obs, inference, step, sync); background arenas report together as room "bg"."""
+    def __init__(self, window=300, log=SESSION_LOGS):
+        super().__init__(log)
+        self.window = window
+        self.stats = {} # rid -> {phase: RollingStats}
+        self.current = {} # rid -> {phase: ms} for the frame in progress
+        self.frame = 0
+
+    def record(self, rid, phase, ms):
+        if rid not in self.current:
+            self.current[rid] = dict.fromkeys(AI_PHASES, 0.0)
+        self.current[rid][phase] += ms
+
+    def end_frame(self):
+        self.frame += 1
+        for rid, phases in self.current.items():
+            if rid not in self.stats:
+                self.stats[rid] = {p: RollingStats(self.window) for p in AI_PHASES + ("total",)}
+            total = sum(phases.values())
+            for phase, ms in phases.items():
+                self.stats[rid][phase].add(ms)
+            self.stats[rid]["total"].add(total)
+            self.log_row("ai", ("frame", "room") + AI_PHASES + ("total",),
+                         [str(self.frame), str(rid)] + [f"{phases[p]:.3f}" for p in AI_PHASES] + [f"{total:.3f}"])
+        self.current = {}
+
+    def lines(self):
+        lines = ["AI ms       p50    p95    p99"]
+        for rid in sorted(self.stats, key=str):
+            lines.append(f"room {rid}")
+            for phase in AI_PHASES + ("total",):
+                p50, p95, p99 = self.stats[rid][phase].percentiles()
+                lines.append(f"  {phase:<9}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return lines
+
+    def anchor(self, surface):
+        return {"topright": (surface.get_width() - 20, 20)}
+
+
+class FrameProfiler(Overlay):
+    """Per-phase frame times: lap(phase) charges the time since the previous lap to that phase."""
+    def __init__(self, window=300, log=SESSION_LOGS):
+        super().__init__(log)
+        self.stats = {phase: RollingStats(window) for phase in FRAME_PHASES + ("total",)}
+        self.current = dict.fromkeys(FRAME_PHASES, 0.0)
+        self.last = time.perf_counter()
+        self.frame = 0
+
+    def begin_frame(self):
+        self.current = dict.fromkeys(FRAME_PHASES, 0.0)
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        self.frame += 1
+        total = sum(self.current.values())
+        for phase, ms in self.current.items():
+            self.stats[phase].add(ms)
+        self.stats["total"].add(total)
+        self.log_row("frame", ("frame",) + FRAME_PHASES + ("total",),
+                     [str(self.frame)] + [f"{self.current[p]:.3f}" for p in FRAME_PHASES] + [f"{total:.3f}"])
+
+    def lines(self):
+        lines = ["frame ms    p50    p95    p99"]
+        for phase in FRAME_PHASES + ("total",):
+            p50, p95, p99 = self.stats[phase].percentiles()
+            lines.append(f"  {phase:<9}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return lines
+
+    def anchor(self, surface):
+        return {"bottomright": (surface.get_width() - 20, surface.get_height() - 20)}
+
+
+class ProfileCapture:
+    """Runs cProfile over the next n_frames frames when start() is called (F5 in game)."""
+    def __init__(self, n_frames, top=30):
+        self.n_frames = n_frames
+        self.top = top
+        self.profile = None
+        self.frames_left = 0
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def start(self):
+        if self.active:
+            return
+        self.profile = cProfile.Profile()
+        self.frames_left = self.n_frames
+        print(f"Profiling the next {self.n_frames} frames")
+        self.profile.enable()
+
+    def end_frame(self):
+        if not self.active:
+            return
+        self.frames_left -= 1
+        if self.frames_left <= 0:
+            self.finish()
+
+    def finish(self):
+        self.profile.disable()
+        os.makedirs(LOG_DIR, exist_ok=True)
+        path = os.path.join(LOG_DIR, f"profile_{time.strftime('%Y%m%d-%H%M%S')}")
+        self.profile.dump_stats(path + ".pstats")
+
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        with open(path + ".txt", "w") as f:
+            f.write(f"{self.n_frames - self.frames_left} frames\n")
+            f.write(out.getvalue())
+        print(f"Wrote {path}.pstats and {path}.txt")
+        self.profile = None
+
+    def close(self):
+        if self.active:
+            self.finish()
+
+
+class DrawCounters(Overlay):
+    """Per-frame blits, transforms, surfaces created and pixels filled, by subsystem; drawing code calls add()."""
+    def __init__(self, window=300, log=SESSION_LOGS):
+        super().__init__(log)
+        self.window = window
+        self.stats = {} # subsystem -> {kind: RollingStats}
+        self.current = {} # subsystem -> {kind: count} for the frame in progress
+        self.frame = 0
+
+    def add(self, subsystem, blits=0, transforms=0, surfaces=0, pixels=0):
+        counts = self.current.get(subsystem)
+        if counts is None:
+            counts = self.current[subsystem] = dict.fromkeys(DRAW_COUNTS, 0)
+        counts["blits"] += blits
+        counts["transforms"] += transforms
+        counts["surfaces"] += surfaces
+        counts["pixels"] += pixels
+
+    def end_frame(self):
+        self.frame += 1
+        for subsystem in self.current.keys() | self.stats.keys():
+            if subsystem not in self.stats:
+                self.stats[subsystem] = {kind: RollingStats(self.window) for kind in DRAW_COUNTS}
+            counts = self.current.get(subsystem)
+            for kind in DRAW_COUNTS:
+                self.stats[subsystem][kind].add(counts[kind] if counts else 0)
+            if counts:
+                self.log_row("draws", ("frame", "subsystem") + DRAW_COUNTS,
+                             [str(self.frame), subsystem] + [str(counts[k]) for k in DRAW_COUNTS])
+        self.current = {}
+
+    def lines(self):
+        lines = ["per frame   blits  xform  surfs  kpix"]
+        for subsystem in sorted(self.stats):
+            means = [sum(self.stats[subsystem][kind].values) / max(1, len(self.stats[subsystem][kind].values))
+                     for kind in DRAW_COUNTS]
+            lines.append(f"  {subsystem:<9}{means[0]:6.1f} {means[1]:6.2f} {means[2]:6.2f} {means[3] / 1000:6.0f}")
+        return lines
+
+    def anchor(self, surface):
+        return {"bottomleft": (20, surface.get_height() - 20)}
+
+
+draw_counts = DrawCounters()
+
+
+def owned_bytes(objs, seen):
+    """(surfaces, surface bytes, other bytes) held by objs. Anything already in seen is skipped."""
+    surfaces = surface_bytes = other = 0
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, pygame.Surface):
+            if obj.get_parent() is None:
+                surfaces += 1
+                surface_bytes += obj.get_pitch() * obj.get_height()
+        elif hasattr(obj, "element_size") and hasattr(obj, "nelement"): # torch tensor
+            other += obj.element_size() * obj.nelement()
+        elif hasattr(type(obj), "nbytes"): # numpy array
+            other += obj.nbytes
+        else:
+            other += sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+                stack.extend(obj)
+            elif hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+    return surfaces, surface_bytes, other
+
+
+class MemoryReport:
+    """Bytes held per owning subsystem, printed at level load and on F6."""
+    def __init__(self, trace=False, top=10):
+        self.trace = trace # trace the whole session and snapshot at every report
+        self.top = top
+        self.snapshot = None
+        self.totals = {} # subsystem -> bytes at the last report
+        self.log = None
+        if trace:
+            tracemalloc.start()
+
+    def toggle_trace(self, label, owners):
+        """F6: the first press starts tracing, the next reports the growth since then and stops it."""
+        if self.trace or not tracemalloc.is_tracing():
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            return self.report(label + ", tracing until the next F6", owners, save=True)
+        text = self.report(label, owners, save=True)
+        tracemalloc.stop()
+        self.snapshot = None
+        return text
+
+    def report(self, label, owners, save=SESSION_LOGS):
+        start = time.perf_counter()
+        lines = [f"--- memory: {label} ---",
+                 f"  {'owner':<10}{'surfaces':>9}{'surface MB':>12}{'other MB':>10}{'change MB':>11}"]
+        # snapshot before counting, so the counting's own allocations stay out of it
+        heap, growth = None, []
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                tracemalloc.Filter(False, "<unknown>")))
+            current, peak = tracemalloc.get_traced_memory()
+            heap = f"  traced python heap {current / 2**20:.2f} MB, peak {peak / 2**20:.2f} MB"
+            if self.snapshot is not None:
+                growth = [s for s in snapshot.compare_to(self.snapshot, "lineno") if s.size_diff > 0][:self.top]
+            self.snapshot = snapshot
+
+        seen = set()
+        totals = {}
+        for owner, objs in owners.items():
+            surfaces, surface_bytes, other = owned_bytes(objs, seen)
+            totals[owner] = surface_bytes + other
+            change = totals[owner] - self.totals.get(owner, 0)
+            lines.append(f"  {owner:<10}{surfaces:>9}{surface_bytes / 2**20:>12.2f}{other / 2**20:>10.2f}{change / 2**20:>+11.2f}")
+        self.totals = totals
+
+        if heap:
+            lines.append(heap)
+        if growth:
+            lines.append("  top growth since the last snapshot:")
+            for stat in growth:
+                frame = stat.traceback[0]
+                lines.append(f"    {stat.size_diff / 1024:+9.1f} KB {stat.count_diff:+7d} blocks  "
+                             f"{os.path.relpath(frame.filename)}:{frame.lineno}")
+        lines.append(f"  ({(time.perf_counter() - start) * 1000:.0f}ms to take)")
+
+        text = "\n".join(lines)
+        print(text)
+        if save:
+            if self.log is None:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                self.log = open(os.path.join(LOG_DIR, f"memory_{time.strftime('%Y%m%d-%H%M%S')}.txt"), "w")
+            self.log.write(text + "\n\n")
+            self.log.flush()
+        return text
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
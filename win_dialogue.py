@@ -2,6 +2,7 @@ import json
 import os
 
 from game_config import *
+from assets import render_text
 import pygame
 
 COMPLETION_FILE = "level_progress.json"
@@ -37,10 +38,8 @@ def win_menu(screen):
     overlay.fill((0, 0, 0))
     screen.blit(overlay, (0, 0))
 
-    font = pygame.font.SysFont(None, 64)
-    small_font = pygame.font.SysFont(None, 32)
-    title_surf = font.render("You Win", True, (255, 255, 255))
-    prompt_surf = small_font.render("Press Enter, Space, or click to continue", True, (220, 220, 220))
+    title_surf = render_text(None, 64, "You Win", (255, 255, 255))
+    prompt_surf = render_text(None, 32, "Press Enter, Space, or click to continue", (220, 220, 220))
 
     center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
     screen.blit(title_surf, (center_x - title_surf.get_width() // 2, center_y - 50))